@@ -8,6 +8,7 @@ Automated query to ensure data completeness and gradients before training
 import sys
 import os
 import lancedb
+import duckdb
 import json
 import pandas as pd
 import numpy as np
@@ -19,6 +20,8 @@ class DataHealthChecker:
         self.db_path = Path(__file__).parent / "storage-agent" / "data" / "vectors"
         self.db = None
         self.table = None
+        # One in-process DuckDB connection, reused by every approx_unique_count call
+        self.duck = duckdb.connect()
         
     def connect(self):
         """Connect to LanceDB directly"""
@@ -33,6 +36,14 @@ class DataHealthChecker:
             print(f"❌ Connection failed: {e}")
             return False
     
+    def approx_unique_count(self, values):
+        """Approximate distinct count (HyperLogLog) - only compared against small thresholds"""
+        self.duck.register("fv", values.to_frame(name='pnl'))
+        try:
+            return self.duck.execute("SELECT approx_count_distinct(pnl) FROM fv").fetchone()[0]
+        finally:
+            self.duck.unregister("fv")
+    
     def get_schema_info(self):
         """Get comprehensive schema information"""
         print("\n📋 SCHEMA ANALYSIS")
@@ -158,7 +169,7 @@ class DataHealthChecker:
                 std_pnl = pnl_data.std()
                 winners = (pnl_data > 0).sum()
                 losers = (pnl_data < 0).sum()
-                unique_values = pnl_data.nunique()
+                unique_values = self.approx_unique_count(pnl_data)
                 
                 if with_pnl > 0:
                     win_rate = (winners / with_pnl) * 100
@@ -265,7 +276,7 @@ class DataHealthChecker:
                 pnl_series = all_records['pnl'].dropna()
                 with_pnl = len(pnl_series)
                 pnl_variance = pnl_series.std() if len(pnl_series) > 0 else 0
-                unique_pnls = pnl_series.nunique()
+                unique_pnls = self.approx_unique_count(pnl_series)
                 
                 if with_pnl >= 500 and pnl_variance > 5 and unique_pnls >= 20:
                     readiness_score += 25
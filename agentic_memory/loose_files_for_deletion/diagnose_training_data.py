@@ -3,105 +3,262 @@
 Diagnostic script to analyze training data quality issues
 """
 
-import json
+import math
 import numpy as np
 import os
-from collections import Counter
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as paj
+from dataclasses import dataclass
+from numba import njit
 
-def diagnose_training_file(filepath):
-    """Analyze a single training file"""
-    print(f"\n{'='*60}")
-    print(f"Analyzing: {os.path.basename(filepath)}")
-    print('='*60)
-    
-    with open(filepath, 'r') as f:
-        data = json.load(f)
-    
-    if 'data' not in data:
-        print("❌ Missing 'data' key in file")
-        return
+def list_column_to_numpy(column):
+    """Convert a single-row Arrow list column (1-D or 2-D) to a numpy array"""
+    rows = column.flatten()
+    if pa.types.is_list(rows.type):
+        if len(rows) == 0:
+            return rows.flatten().to_numpy(zero_copy_only=False)
+        # Reshaping the flat child values is only valid when every row has the same length
+        lengths = pc.min_max(pc.list_value_length(rows)).as_py()
+        if lengths['min'] == lengths['max']:
+            return rows.flatten().to_numpy(zero_copy_only=False).reshape(len(rows), -1)
+        # Ragged rows: let numpy stack them (and raise) as it would for the plain JSON lists
+        return np.stack([np.asarray(row, dtype=np.float64) for row in rows.to_pylist()])
+    return rows.to_numpy(zero_copy_only=False)
+
+@njit(cache=True)
+def fused_target_stats(pnl, sl, tp, final, has_final):
+    """Single pass over the target columns: Welford mean/var plus min/max per column"""
+    n = pnl.shape[0]
+    columns = (pnl, sl, tp, final)
+    moments = np.zeros((4, 4))  # rows: pnl, sl, tp, final; cols: mean, m2, min, max
+    for c in range(4):
+        moments[c, 2] = np.inf
+        moments[c, 3] = -np.inf
+    near_zero = 0
+    matches = True
+    sl_constant = True
+    tp_constant = True
+    for i in range(n):
+        for c in range(4):
+            if c == 3 and not has_final:
+                continue
+            x = columns[c][i]
+            delta = x - moments[c, 0]
+            moments[c, 0] += delta / (i + 1)
+            moments[c, 1] += delta * (x - moments[c, 0])
+            if x < moments[c, 2]:
+                moments[c, 2] = x
+            if x > moments[c, 3]:
+                moments[c, 3] = x
+        if abs(pnl[i]) < 0.01:
+            near_zero += 1
+        if sl[i] != sl[0]:
+            sl_constant = False
+        if tp[i] != tp[0]:
+            tp_constant = False
+        # Same tolerance as np.allclose(final, pnl)
+        if has_final and abs(final[i] - pnl[i]) > 1e-8 + 1e-5 * abs(pnl[i]):
+            matches = False
+    for c in range(4):
+        moments[c, 1] = moments[c, 1] / n if n > 0 else 0.0
+    return moments, near_zero, matches, sl_constant, tp_constant
+
+@dataclass
+class TrainingStats:
+    """Everything the report prints, computed once per file"""
+    n_samples: int
+    n_features: int
+    pnl_mean: float
+    pnl_var: float
+    pnl_min: float
+    pnl_max: float
+    pnl_unique: np.ndarray
+    pnl_unique_counts: np.ndarray
+    near_zero_pnls: int
+    zero_var_indices: np.ndarray
+    sl_min: float
+    sl_max: float
+    sl_var: float
+    sl_constant: bool
+    tp_min: float
+    tp_max: float
+    tp_var: float
+    tp_constant: bool
+    has_trajectory: bool
+    final_mean: float
+    final_var: float
+    final_matches_pnl: bool
+
+@dataclass
+class TrainingArrays:
+    """Arrays extracted from one training file (one column per target)"""
+    features: np.ndarray
+    pnl_targets: np.ndarray
+    trajectory_targets: np.ndarray
+    risk_targets: np.ndarray
     
-    # Extract arrays
-    features = np.array(data['data']['features'])
-    pnl_targets = np.array(data['data']['pnl_targets'])
-    trajectory_targets = np.array(data['data']['trajectory_targets'])
-    risk_targets = np.array(data['data']['risk_targets'])
+    def summarize(self):
+        """Compute all report statistics, walking the target arrays once"""
+        # Contiguous, writable float64 columns so the jitted loop sees one array type
+        # (zero-copy Arrow buffers are read-only, which numba types separately)
+        column_requirements = ['C_CONTIGUOUS', 'WRITEABLE']
+        pnl = np.require(self.pnl_targets, dtype=np.float64, requirements=column_requirements)
+        sl = np.require(self.risk_targets[:, 0], dtype=np.float64, requirements=column_requirements)
+        tp = np.require(self.risk_targets[:, 1], dtype=np.float64, requirements=column_requirements)
+        has_trajectory = self.trajectory_targets.shape[1] > 0
+        final = np.require(self.trajectory_targets[:, -1] if has_trajectory else pnl,
+                           dtype=np.float64, requirements=column_requirements)
+        
+        moments, near_zero, matches, sl_constant, tp_constant = fused_target_stats(
+            pnl, sl, tp, final, has_trajectory)
+        
+        feature_vars = np.var(self.features, axis=0)
+        pnl_unique, pnl_unique_counts = np.unique(pnl, return_counts=True)
+        
+        return TrainingStats(
+            n_samples=len(self.features),
+            n_features=self.features.shape[1],
+            pnl_mean=moments[0, 0],
+            pnl_var=moments[0, 1],
+            pnl_min=moments[0, 2],
+            pnl_max=moments[0, 3],
+            pnl_unique=pnl_unique,
+            pnl_unique_counts=pnl_unique_counts,
+            near_zero_pnls=near_zero,
+            zero_var_indices=np.where(feature_vars < 1e-10)[0],
+            sl_min=moments[1, 2],
+            sl_max=moments[1, 3],
+            sl_var=moments[1, 1],
+            sl_constant=sl_constant,
+            tp_min=moments[2, 2],
+            tp_max=moments[2, 3],
+            tp_var=moments[2, 1],
+            tp_constant=tp_constant,
+            has_trajectory=has_trajectory,
+            final_mean=moments[3, 0],
+            final_var=moments[3, 1],
+            final_matches_pnl=matches,
+        )
+
+def load_training_arrays(filepath):
+    """Read a training file into TrainingArrays (None if the 'data' key is missing)"""
+    # Parse straight into Arrow buffers - the file is one (pretty-printed) JSON object, so the
+    # read block must hold the whole file or the object straddles block boundaries
+    read_options = paj.ReadOptions(block_size=max(os.path.getsize(filepath) + 1, 1 << 20))
+    table = paj.read_json(filepath, read_options=read_options,
+                          parse_options=paj.ParseOptions(newlines_in_values=True))
     
-    print(f"\n📊 Data Shape:")
-    print(f"  Features: {features.shape}")
-    print(f"  PnL targets: {pnl_targets.shape}")
-    print(f"  Trajectory targets: {trajectory_targets.shape}")
-    print(f"  Risk targets: {risk_targets.shape}")
+    if 'data' not in table.column_names:
+        return None
     
-    # PnL Analysis
+    data = table['data'].combine_chunks()
+    return TrainingArrays(
+        features=list_column_to_numpy(data.field('features')),
+        pnl_targets=list_column_to_numpy(data.field('pnl_targets')),
+        trajectory_targets=list_column_to_numpy(data.field('trajectory_targets')),
+        risk_targets=list_column_to_numpy(data.field('risk_targets')),
+    )
+
+def print_pnl_analysis(stats):
+    """Print PnL distribution section"""
     print(f"\n💰 PnL Analysis:")
-    print(f"  Mean: ${np.mean(pnl_targets):.2f}")
-    print(f"  Std: ${np.std(pnl_targets):.2f}")
-    print(f"  Min: ${np.min(pnl_targets):.2f}")
-    print(f"  Max: ${np.max(pnl_targets):.2f}")
-    print(f"  Variance: {np.var(pnl_targets):.6f}")
+    print(f"  Mean: ${stats.pnl_mean:.2f}")
+    print(f"  Std: ${math.sqrt(stats.pnl_var):.2f}")
+    print(f"  Min: ${stats.pnl_min:.2f}")
+    print(f"  Max: ${stats.pnl_max:.2f}")
+    print(f"  Variance: {stats.pnl_var:.6f}")
     
     # Count unique values
-    unique_pnls = np.unique(pnl_targets)
-    print(f"  Unique values: {len(unique_pnls)}")
+    print(f"  Unique values: {len(stats.pnl_unique)}")
     
-    if len(unique_pnls) <= 10:
+    if len(stats.pnl_unique) <= 10:
         print("  Value counts:")
-        pnl_counts = Counter(pnl_targets)
-        for pnl, count in pnl_counts.most_common():
-            print(f"    ${pnl:.2f}: {count} trades ({count/len(pnl_targets)*100:.1f}%)")
+        value_counts = sorted(zip(stats.pnl_unique, stats.pnl_unique_counts), key=lambda vc: -vc[1])
+        for pnl, count in value_counts:
+            print(f"    ${pnl:.2f}: {count} trades ({count/stats.n_samples*100:.1f}%)")
     
     # Zero check
-    zero_pnls = np.sum(np.abs(pnl_targets) < 0.01)
-    print(f"  Near-zero PnLs: {zero_pnls}/{len(pnl_targets)} ({zero_pnls/len(pnl_targets)*100:.1f}%)")
-    
-    # Feature variance analysis
+    print(f"  Near-zero PnLs: {stats.near_zero_pnls}/{stats.n_samples} ({stats.near_zero_pnls/stats.n_samples*100:.1f}%)")
+
+def print_feature_analysis(stats):
+    """Print feature variance section"""
     print(f"\n🔍 Feature Analysis:")
-    feature_vars = np.var(features, axis=0)
-    zero_var_features = np.sum(feature_vars < 1e-10)
-    print(f"  Zero variance features: {zero_var_features}/{features.shape[1]}")
+    zero_var_features = len(stats.zero_var_indices)
+    print(f"  Zero variance features: {zero_var_features}/{stats.n_features}")
     
     if zero_var_features > 0:
-        zero_var_indices = np.where(feature_vars < 1e-10)[0]
+        zero_var_indices = stats.zero_var_indices
         print(f"  Indices: {zero_var_indices[:10]}..." if len(zero_var_indices) > 10 else f"  Indices: {zero_var_indices}")
-    
-    # Risk targets analysis
+
+def print_risk_analysis(stats):
+    """Print risk targets section"""
     print(f"\n🎯 Risk Targets Analysis:")
-    print(f"  SL range: [{np.min(risk_targets[:, 0]):.2f}, {np.max(risk_targets[:, 0]):.2f}]")
-    print(f"  TP range: [{np.min(risk_targets[:, 1]):.2f}, {np.max(risk_targets[:, 1]):.2f}]")
-    print(f"  SL variance: {np.var(risk_targets[:, 0]):.2f}")
-    print(f"  TP variance: {np.var(risk_targets[:, 1]):.2f}")
-    
-    # Trajectory analysis
+    print(f"  SL range: [{stats.sl_min:.2f}, {stats.sl_max:.2f}]")
+    print(f"  TP range: [{stats.tp_min:.2f}, {stats.tp_max:.2f}]")
+    print(f"  SL variance: {stats.sl_var:.2f}")
+    print(f"  TP variance: {stats.tp_var:.2f}")
+
+def print_trajectory_analysis(stats):
+    """Print trajectory section"""
     print(f"\n📈 Trajectory Analysis:")
-    if trajectory_targets.shape[1] > 0:
-        final_values = trajectory_targets[:, -1]
-        print(f"  Final value mean: ${np.mean(final_values):.2f}")
-        print(f"  Final value std: ${np.std(final_values):.2f}")
-        print(f"  Matches PnL: {np.allclose(final_values, pnl_targets)}")
-    
-    # Data quality warnings
-    print(f"\n⚠️  Warnings:")
+    if stats.has_trajectory:
+        print(f"  Final value mean: ${stats.final_mean:.2f}")
+        print(f"  Final value std: ${math.sqrt(stats.final_var):.2f}")
+        print(f"  Matches PnL: {stats.final_matches_pnl}")
+
+def collect_warnings(stats):
+    """Data quality warnings derived from the summary"""
     warnings = []
     
-    if np.var(pnl_targets) < 1e-6:
+    if stats.pnl_var < 1e-6:
         warnings.append("❌ CRITICAL: PnL has zero variance - all trades have same outcome!")
     
-    if zero_pnls > len(pnl_targets) * 0.8:
+    if stats.near_zero_pnls > stats.n_samples * 0.8:
         warnings.append("❌ CRITICAL: >80% of trades have zero PnL!")
     
-    if zero_var_features > features.shape[1] * 0.3:
+    if len(stats.zero_var_indices) > stats.n_features * 0.3:
         warnings.append("⚠️  >30% of features have zero variance")
     
-    if len(unique_pnls) < 5:
+    if len(stats.pnl_unique) < 5:
         warnings.append("⚠️  Very few unique PnL values - possible data issue")
     
-    if np.all(risk_targets[:, 0] == risk_targets[0, 0]):
+    if stats.sl_constant:
         warnings.append("⚠️  All stop losses are identical")
     
-    if np.all(risk_targets[:, 1] == risk_targets[0, 1]):
+    if stats.tp_constant:
         warnings.append("⚠️  All take profits are identical")
     
+    return warnings
+
+def diagnose_training_file(filepath):
+    """Analyze a single training file"""
+    print(f"\n{'='*60}")
+    print(f"Analyzing: {os.path.basename(filepath)}")
+    print('='*60)
+    
+    arrays = load_training_arrays(filepath)
+    if arrays is None:
+        print("❌ Missing 'data' key in file")
+        return
+    
+    print(f"\n📊 Data Shape:")
+    print(f"  Features: {arrays.features.shape}")
+    print(f"  PnL targets: {arrays.pnl_targets.shape}")
+    print(f"  Trajectory targets: {arrays.trajectory_targets.shape}")
+    print(f"  Risk targets: {arrays.risk_targets.shape}")
+    
+    stats = arrays.summarize()
+    
+    print_pnl_analysis(stats)
+    print_feature_analysis(stats)
+    print_risk_analysis(stats)
+    print_trajectory_analysis(stats)
+    
+    # Data quality warnings
+    print(f"\n⚠️  Warnings:")
+    warnings = collect_warnings(stats)
+    
     if len(warnings) == 0:
         print("  ✅ No major issues detected")
     else:
@@ -110,9 +267,9 @@ def diagnose_training_file(filepath):
     
     return {
         'file': os.path.basename(filepath),
-        'n_samples': len(features),
-        'pnl_variance': np.var(pnl_targets),
-        'zero_pnls_pct': zero_pnls/len(pnl_targets)*100,
+        'n_samples': stats.n_samples,
+        'pnl_variance': stats.pnl_var,
+        'zero_pnls_pct': stats.near_zero_pnls/stats.n_samples*100,
         'warnings': len(warnings)
     }
 
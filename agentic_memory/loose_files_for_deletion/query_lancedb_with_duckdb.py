@@ -9,121 +9,284 @@ import os
 import lancedb
 import duckdb
 import json
+import pyarrow as pa
+import pyarrow.compute as pc
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
-def query_database():
+COMPLETE_FILTER = "(recordType = 'UNIFIED' OR recordType IS NULL) AND features IS NOT NULL AND pnl IS NOT NULL"
+
+# Training trades (outcome known); evaluated by Lance when building the trades view
+TRADE_FILTER = "(recordType = 'UNIFIED' OR recordType IS NULL) AND pnl IS NOT NULL"
+
+# Prepared once per process against the ds / trades views (see _refresh_view)
+# GROUPING(instrument_id, direction_id): 3 = totals, 0 = instrument/direction
+QUERIES = {
+    # One scan over all records: grand totals plus per-instrument/direction
+    # groups via GROUPING SETS. Record types only matter as UNIFIED / NULL /
+    # other, so they are conditional counts rather than a string GROUP BY.
+    "summary": """
+        SELECT
+            GROUPING(instrument_id, direction_id) AS grp,
+            instrument_id,
+            direction_id,
+            COUNT(*) AS records,
+            COALESCE(SUM((recordType = 'UNIFIED')::BIGINT), 0) AS unified,
+            SUM((recordType IS NULL)::BIGINT) AS null_rt,
+            COALESCE(SUM((recordType <> 'UNIFIED')::BIGINT), 0) AS other_rt
+        FROM ds
+        GROUP BY GROUPING SETS ((), (instrument_id, direction_id))
+    """,
+    # PnL stats over the pre-filtered trades view, totals and per combo.
+    # Win rates and the PnL range label are computed in SQL, not in Python.
+    "trades": """
+        WITH g AS (
+            SELECT
+                GROUPING(instrument_id, direction_id) AS grp,
+                instrument_id,
+                direction_id,
+                COUNT(*) AS trades,
+                SUM(pnl) AS sum_pnl,
+                MIN(pnl) AS min_pnl,
+                MAX(pnl) AS max_pnl,
+                SUM(is_winner::BIGINT) AS winners,
+                SUM(is_loser::BIGINT) AS losers
+            FROM trades
+            GROUP BY GROUPING SETS ((), (instrument_id, direction_id))
+        )
+        SELECT *,
+               sum_pnl / NULLIF(trades, 0) AS avg_pnl,
+               COALESCE(100.0 * winners / NULLIF(trades, 0), 0) AS win_rate,
+               printf('$%.2f to $%.2f', min_pnl, max_pnl) AS pnl_range
+        FROM g
+    """,
+    # Full per-type listing is a string-keyed GROUP BY - only run with --verbose
+    "record_types": """
+        SELECT recordType, COUNT(*) AS count
+        FROM ds
+        WHERE recordType <> 'UNIFIED'
+        GROUP BY recordType
+        ORDER BY count DESC
+    """,
+}
+
+# Process-wide LanceDB/DuckDB handles, created lazily by _get_state()
+_state = None
+
+def dictionary_codes(table, column, dictionary=None):
+    """Replace a low-cardinality string column with integer dictionary codes"""
+    values = table[column].combine_chunks()
+    if dictionary is None:
+        encoded = values.dictionary_encode()
+        indices, dictionary = encoded.indices, encoded.dictionary
+    else:
+        # Reuse an existing dictionary so codes line up across views
+        indices = pc.index_in(values, value_set=dictionary)
+    index = table.schema.get_field_index(column)
+    table = table.set_column(index, f"{column}_id", indices)
+    return table, dictionary
+
+def iter_rows(reader):
+    """Yield result rows as dicts, converting one Arrow record batch at a time"""
+    for batch in reader:
+        yield from batch.to_pylist()
+
+def _get_state():
+    """Open LanceDB and DuckDB once per process; later calls only re-read the table manifest"""
+    global _state
+    if _state is not None:
+        # Cheap manifest read - picks up a new table version if one was written
+        _state['table'] = _state['db'].open_table("feature_vectors")
+        return _state
+    
+    # Connect to LanceDB
+    db_path = Path(__file__).parent / "storage-agent" / "data" / "vectors"
+    print(f"Database path: {db_path}")
+    
+    db = lancedb.connect(str(db_path))
+    print("✅ Connected to LanceDB")
+    
+    table = db.open_table("feature_vectors")
+    print("✅ Opened feature_vectors table")
+    
+    # A small pool of in-process connections, one per prepared query, so the
+    # independent aggregates run concurrently. Each connection gets the ds view
+    # registered and the statements prepared (see _refresh_view) instead of a
+    # replacement scan re-resolving the dataset on every statement.
+    threads = max(1, os.cpu_count() // len(QUERIES))
+    conns = {query_id: duckdb.connect(config={"threads": threads}) for query_id in QUERIES}
+    
+    _state = {
+        'db': db,
+        'table': table,
+        'conns': conns,
+        # +1 worker for the Lance complete-record count
+        'executor': ThreadPoolExecutor(max_workers=len(conns) + 1),
+        'version': None,
+        'prepared': False,
+        'labels': None,
+    }
+    return _state
+
+def _refresh_view(state):
+    """Re-project the Lance dataset into the ds view when the table version changes"""
+    table = state['table']
+    if state['version'] == table.version:
+        return
+    
+    # Convert to Lance dataset for DuckDB
+    lance_dataset = table.to_lance()
+    print("✅ Converted to Lance dataset")
+    
+    # Project in the Lance scan: only the narrow columns the queries use,
+    # so the feature vector column never reaches DuckDB
+    projected = lance_dataset.scanner(columns={
+        "recordType": "recordType",
+        "instrument": "instrument",
+        "direction": "direction",
+        "pnl": "pnl",
+    }).to_table()
+    
+    # Trades are filtered inside Lance, so DuckDB only sees the narrow,
+    # already-filtered stream for the PnL aggregates. The win/loss flags are
+    # evaluated once here and shared by the totals and per-combo groups.
+    trades = lance_dataset.scanner(
+        filter=TRADE_FILTER,
+        columns={
+            "instrument": "instrument",
+            "direction": "direction",
+            "pnl": "pnl",
+            "is_winner": "pnl > 0",
+            "is_loser": "pnl < 0",
+        },
+    ).to_table()
+    
+    # Instruments/directions have tiny cardinality - group on int codes and
+    # map back to labels only for the printed rows
+    projected, instruments = dictionary_codes(projected, "instrument")
+    projected, directions = dictionary_codes(projected, "direction")
+    trades, _ = dictionary_codes(trades, "instrument", instruments)
+    trades, _ = dictionary_codes(trades, "direction", directions)
+    
+    for con in state['conns'].values():
+        con.register("ds", projected)
+        con.register("trades", trades)
+        if not state['prepared']:
+            for query_id, sql in QUERIES.items():
+                con.execute(f"PREPARE {query_id} AS {sql}")
+    state['prepared'] = True
+    
+    state['labels'] = (instruments.to_pylist(), directions.to_pylist())
+    state['version'] = table.version
+
+@lru_cache(maxsize=16)
+def _cached_result(table_version, query_id):
+    """Prepared statement result - aggregates are static until the table version bumps"""
+    result = _state['conns'][query_id].execute(f"EXECUTE {query_id}").arrow()
+    # DuckDB >= 1.4 returns a single-use RecordBatchReader; cache a materialised Table so hits can re-read it
+    if isinstance(result, pa.RecordBatchReader):
+        result = result.read_all()
+    return result
+
+@lru_cache(maxsize=16)
+def _cached_count(table_version, filter_sql=None):
+    """Lance row count (pushed-down filter) for one table version"""
+    return _state['table'].count_rows(filter_sql)
+
+def query_database(verbose=False):
     try:
         print("🔍 Querying LanceDB with DuckDB...\n")
         
-        # Connect to LanceDB
-        db_path = Path(__file__).parent / "storage-agent" / "data" / "vectors"
-        print(f"Database path: {db_path}")
+        state = _get_state()
+        table = state['table']
+        version = table.version
         
-        db = lancedb.connect(str(db_path))
-        print("✅ Connected to LanceDB")
+        # Row counts come from the Lance manifest / pushed-down filters, so an
+        # empty table never opens an Arrow stream or a DuckDB plan
+        total_count = _cached_count(version)
+        print(f"\n📊 Total Records: {total_count:,}")
         
-        table = db.open_table("feature_vectors")
-        print("✅ Opened feature_vectors table")
+        if total_count == 0:
+            return 0, 0
         
-        # Convert to Lance dataset for DuckDB
-        lance_dataset = table.to_lance()
-        print("✅ Converted to Lance dataset")
+        _refresh_view(state)
+        instrument_labels, direction_labels = state['labels']
         
-        # Count total records
-        result = duckdb.query("SELECT COUNT(*) as total_count FROM lance_dataset").fetchall()
-        total_count = result[0][0]
-        print(f"\n📊 Total Records: {total_count:,}")
+        # Independent scans: Lance count, summary and (optionally) record types
+        executor = state['executor']
+        complete_future = executor.submit(_cached_count, version, COMPLETE_FILTER)
+        summary_future = executor.submit(_cached_result, version, "summary")
+        trades_future = executor.submit(_cached_result, version, "trades")
+        record_types_future = executor.submit(_cached_result, version, "record_types") if verbose else None
         
-        if total_count > 0:
-            # Get schema info
-            schema_result = duckdb.query("DESCRIBE lance_dataset").fetchall()
-            print(f"\n📋 Schema ({len(schema_result)} columns):")
-            for col_name, col_type, null, key, default, extra in schema_result:
-                print(f"  {col_name}: {col_type}")
-            
-            # Record type breakdown
-            record_types = duckdb.query("""
-                SELECT recordType, COUNT(*) as count 
-                FROM lance_dataset 
-                GROUP BY recordType 
-                ORDER BY count DESC
-            """).fetchall()
-            
-            print("\n📋 Record Type Breakdown:")
-            for record_type, count in record_types:
-                print(f"  {record_type}: {count:,} records")
-            
-            # Instrument and direction breakdown
-            instruments = duckdb.query("""
-                SELECT instrument, direction, COUNT(*) as count 
-                FROM lance_dataset 
-                WHERE instrument IS NOT NULL AND direction IS NOT NULL
-                GROUP BY instrument, direction 
-                ORDER BY instrument, direction
-            """).fetchall()
-            
-            print("\n🎯 Instrument/Direction Breakdown:")
-            for instrument, direction, count in instruments:
-                print(f"  {instrument} {direction}: {count:,} records")
-            
-            # Check for complete training data (records with both features and PnL)
-            complete_records = duckdb.query("""
-                SELECT COUNT(*) as complete_count
-                FROM lance_dataset 
-                WHERE (recordType = 'UNIFIED' OR recordType IS NULL)
-                  AND features IS NOT NULL 
-                  AND pnl IS NOT NULL
-            """).fetchall()
-            
-            complete_count = complete_records[0][0]
-            print(f"\n💡 Complete training records: {complete_count:,}")
+        complete_count = complete_future.result()
+        summary = summary_future.result().to_batches(max_chunksize=1024)
+        trade_summary = trades_future.result().to_batches(max_chunksize=1024)
+        
+        totals = None
+        combos = []
+        for row in iter_rows(summary):
+            if row['grp'] == 3:
+                totals = row
+            elif row['instrument_id'] is not None and row['direction_id'] is not None:
+                row['instrument'] = instrument_labels[row['instrument_id']]
+                row['direction'] = direction_labels[row['direction_id']]
+                combos.append(row)
+        
+        trade_totals = None
+        training_breakdown = []
+        for row in iter_rows(trade_summary):
+            if row['grp'] == 3:
+                trade_totals = row
+            elif row['instrument_id'] is not None and row['direction_id'] is not None:
+                row['instrument'] = instrument_labels[row['instrument_id']]
+                row['direction'] = direction_labels[row['direction_id']]
+                training_breakdown.append(row)
+        
+        # Get schema info (static per table version - no SQL round-trip needed)
+        schema_result = [(field.name, str(field.type)) for field in table.schema]
+        print(f"\n📋 Schema ({len(schema_result)} columns):")
+        for col_name, col_type in schema_result:
+            print(f"  {col_name}: {col_type}")
+        
+        # Record type breakdown
+        print("\n📋 Record Type Breakdown:")
+        print(f"  UNIFIED: {totals['unified']:,} records")
+        print(f"  None: {totals['null_rt']:,} records")
+        print(f"  Other: {totals['other_rt']:,} records")
+        
+        if verbose and totals['other_rt'] > 0:
+            record_types = record_types_future.result().to_batches(max_chunksize=1024)
+            print("\n".join(f"    {row['recordType']}: {row['count']:,} records" for row in iter_rows(record_types)))
+        
+        # Instrument and direction breakdown
+        lines = ["\n🎯 Instrument/Direction Breakdown:"]
+        lines.extend(
+            f"  {row['instrument']} {row['direction']}: {row['records']:,} records"
+            for row in sorted(combos, key=lambda row: (row['instrument'], row['direction']))
+        )
+        print("\n".join(lines))
+        
+        # Check for complete training data (records with both features and PnL)
+        print(f"\n💡 Complete training records: {complete_count:,}")
+        
+        if complete_count > 0:
+            # Analyze PnL distribution
+            print(f"\n💰 PnL Analysis ({trade_totals['trades']:,} trades):")
+            print(f"  Win Rate: {trade_totals['win_rate']:.1f}% ({trade_totals['winners']:,} wins, {trade_totals['losers']:,} losses)")
+            print(f"  Average PnL: ${trade_totals['avg_pnl']:.2f}")
+            print(f"  Range: {trade_totals['pnl_range']}")
             
-            if complete_count > 0:
-                # Analyze PnL distribution
-                pnl_stats = duckdb.query("""
-                    SELECT 
-                        COUNT(*) as trades,
-                        AVG(pnl) as avg_pnl,
-                        MIN(pnl) as min_pnl,
-                        MAX(pnl) as max_pnl,
-                        COUNT(CASE WHEN pnl > 0 THEN 1 END) as winners,
-                        COUNT(CASE WHEN pnl < 0 THEN 1 END) as losers
-                    FROM lance_dataset 
-                    WHERE (recordType = 'UNIFIED' OR recordType IS NULL)
-                      AND pnl IS NOT NULL
-                """).fetchall()
-                
-                trades, avg_pnl, min_pnl, max_pnl, winners, losers = pnl_stats[0]
-                win_rate = (winners / trades * 100) if trades > 0 else 0
-                
-                print(f"\n💰 PnL Analysis ({trades:,} trades):")
-                print(f"  Win Rate: {win_rate:.1f}% ({winners:,} wins, {losers:,} losses)")
-                print(f"  Average PnL: ${avg_pnl:.2f}")
-                print(f"  Range: ${min_pnl:.2f} to ${max_pnl:.2f}")
-                
-                # Breakdown by instrument/direction for training data
-                training_breakdown = duckdb.query("""
-                    SELECT 
-                        instrument, 
-                        direction, 
-                        COUNT(*) as trades,
-                        AVG(pnl) as avg_pnl,
-                        COUNT(CASE WHEN pnl > 0 THEN 1 END) as winners
-                    FROM lance_dataset 
-                    WHERE (recordType = 'UNIFIED' OR recordType IS NULL)
-                      AND pnl IS NOT NULL
-                      AND instrument IS NOT NULL 
-                      AND direction IS NOT NULL
-                    GROUP BY instrument, direction 
-                    ORDER BY trades DESC
-                """).fetchall()
-                
-                print(f"\n📊 Training Data by Instrument/Direction:")
-                for instrument, direction, trades, avg_pnl, winners in training_breakdown:
-                    win_rate = (winners / trades * 100) if trades > 0 else 0
-                    print(f"  {instrument} {direction}: {trades:,} trades, {win_rate:.1f}% win rate, ${avg_pnl:.2f} avg")
-        
-        return total_count, complete_count if total_count > 0 else 0
+            # Breakdown by instrument/direction for training data
+            lines = [f"\n📊 Training Data by Instrument/Direction:"]
+            lines.extend(
+                f"  {row['instrument']} {row['direction']}: {row['trades']:,} trades, {row['win_rate']:.1f}% win rate, ${row['avg_pnl']:.2f} avg"
+                for row in sorted(training_breakdown, key=lambda row: row['trades'], reverse=True)
+            )
+            print("\n".join(lines))
+        
+        return total_count, complete_count
         
     except Exception as error:
         print(f"❌ Error: {error}")
@@ -132,7 +295,7 @@ def query_database():
         return 0, 0
 
 if __name__ == "__main__":
-    total, complete = query_database()
+    total, complete = query_database(verbose="--verbose" in sys.argv)
     
     if total > 1000:
         print(f"\n🚀 Recommendation: Export all {complete:,} complete records for GP training")
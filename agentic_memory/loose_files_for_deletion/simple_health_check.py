@@ -8,11 +8,14 @@ Focus on key metrics needed for GP training
 import sys
 import os
 import lancedb
-import pandas as pd
-import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 from pathlib import Path
 from tqdm import tqdm
 
+# Only the columns the checks below look at - keeps the scan narrow
+ANALYSIS_COLUMNS = ['pnl', 'features', 'instrument', 'direction', 'entryType', 'recordType']
+
 class SimpleHealthChecker:
     def __init__(self):
         self.db_path = Path(__file__).parent / "storage-agent" / "data" / "vectors"
@@ -28,8 +31,9 @@ class SimpleHealthChecker:
             self.table = self.db.open_table("feature_vectors")
             
             print("📥 Loading all records...")
-            # Load all data as pandas DataFrame
-            self.data = self.table.search().limit(999999).to_pandas()
+            # Load all data as an Arrow table (no pandas materialization)
+            columns = [c for c in ANALYSIS_COLUMNS if c in self.table.schema.names]
+            self.data = self.table.search().select(columns).limit(999999).to_arrow()
             
             print(f"✅ Loaded {len(self.data):,} records")
             return True
@@ -38,6 +42,28 @@ class SimpleHealthChecker:
             print(f"❌ Connection/loading failed: {e}")
             return False
     
+    def non_null_count(self, field):
+        """Count non-null values in a column"""
+        column = self.data[field]
+        return len(column) - column.null_count
+    
+    def keyed_instrument_direction(self):
+        """Rows with both instrument and direction set (pandas groupby drops null keys, Arrow keeps them)"""
+        has_keys = pc.and_(pc.is_valid(self.data['instrument']), pc.is_valid(self.data['direction']))
+        return self.data.filter(has_keys)
+    
+    def group_by_instrument_direction(self):
+        """Per instrument/direction record counts with PnL mean and win rate"""
+        table = self.keyed_instrument_direction()
+        aggregations = [([], 'count_all')]
+        if 'pnl' in table.column_names:
+            is_winner = pc.cast(pc.greater(table['pnl'], 0), pa.int64())
+            table = table.append_column('is_winner', is_winner)
+            aggregations += [('pnl', 'count'), ('pnl', 'mean'), ('is_winner', 'mean')]
+        
+        grouped = table.group_by(['instrument', 'direction']).aggregate(aggregations)
+        return grouped.sort_by([('count_all', 'descending')])
+    
     def analyze_data_quality(self):
         """Analyze data quality for training readiness"""
         if self.data is None or len(self.data) == 0:
@@ -47,7 +73,7 @@ class SimpleHealthChecker:
         print(f"\n📊 DATA QUALITY ANALYSIS")
         print("=" * 50)
         
-        total_records = len(self.data)
+        total_records = self.data.num_rows
         print(f"Total Records: {total_records:,}")
         
         # 1. Check critical fields
@@ -55,8 +81,8 @@ class SimpleHealthChecker:
         
         print(f"\n🎯 Critical Field Coverage:")
         for field in critical_fields:
-            if field in self.data.columns:
-                non_null = self.data[field].notna().sum()
+            if field in self.data.column_names:
+                non_null = self.non_null_count(field)
                 coverage = (non_null / total_records) * 100
                 status = "✅" if coverage >= 80 else "⚠️ " if coverage >= 50 else "❌"
                 print(f"  {status} {field}: {coverage:.1f}% ({non_null:,}/{total_records:,})")
@@ -65,18 +91,20 @@ class SimpleHealthChecker:
         
         # 2. PnL Analysis
         print(f"\n💰 PnL Distribution Analysis:")
-        if 'pnl' in self.data.columns:
-            pnl_data = self.data['pnl'].dropna()
+        if 'pnl' in self.data.column_names:
+            pnl_data = pc.drop_null(self.data['pnl'])
             if len(pnl_data) > 0:
+                min_max = pc.min_max(pnl_data).as_py()
                 pnl_stats = {
                     'count': len(pnl_data),
-                    'mean': pnl_data.mean(),
-                    'std': pnl_data.std(),
-                    'min': pnl_data.min(),
-                    'max': pnl_data.max(),
-                    'winners': (pnl_data > 0).sum(),
-                    'losers': (pnl_data < 0).sum(),
-                    'unique': pnl_data.nunique()
+                    'mean': pc.mean(pnl_data).as_py(),
+                    # NaN for a single value, like pandas' Series.std
+                    'std': pc.stddev(pnl_data, ddof=1).as_py() if len(pnl_data) > 1 else float('nan'),
+                    'min': min_max['min'],
+                    'max': min_max['max'],
+                    'winners': pc.sum(pc.cast(pc.greater(pnl_data, 0), pa.int64())).as_py(),
+                    'losers': pc.sum(pc.cast(pc.less(pnl_data, 0), pa.int64())).as_py(),
+                    'unique': pc.count_distinct(pnl_data).as_py()
                 }
                 
                 win_rate = (pnl_stats['winners'] / pnl_stats['count']) * 100
@@ -101,24 +129,18 @@ class SimpleHealthChecker:
         
         # 3. Instrument/Direction Distribution
         print(f"\n🎯 Instrument/Direction Distribution:")
-        if 'instrument' in self.data.columns and 'direction' in self.data.columns:
-            inst_dir_counts = self.data.groupby(['instrument', 'direction']).size().reset_index(name='count')
-            inst_dir_counts = inst_dir_counts.sort_values('count', ascending=False)
+        if 'instrument' in self.data.column_names and 'direction' in self.data.column_names:
+            inst_dir_counts = self.group_by_instrument_direction()
             
-            for _, row in inst_dir_counts.iterrows():
-                instrument, direction, count = row['instrument'], row['direction'], row['count']
-                
-                # Calculate PnL stats for this combo if possible
-                subset = self.data[(self.data['instrument'] == instrument) & 
-                                 (self.data['direction'] == direction)]
+            for row in inst_dir_counts.to_pylist():
+                instrument, direction, count = row['instrument'], row['direction'], row['count_all']
                 
+                # PnL stats for this combo were aggregated in the same pass
                 pnl_info = ""
-                if 'pnl' in subset.columns:
-                    pnl_subset = subset['pnl'].dropna()
-                    if len(pnl_subset) > 0:
-                        avg_pnl = pnl_subset.mean()
-                        win_rate = (pnl_subset > 0).mean() * 100
-                        pnl_info = f", avg: ${avg_pnl:.2f}, {win_rate:.1f}% wins"
+                if row.get('pnl_count'):
+                    avg_pnl = row['pnl_mean']
+                    win_rate = row['is_winner_mean'] * 100
+                    pnl_info = f", avg: ${avg_pnl:.2f}, {win_rate:.1f}% wins"
                 
                 print(f"  {instrument} {direction}: {count:,} records{pnl_info}")
         else:
@@ -126,9 +148,11 @@ class SimpleHealthChecker:
         
         # 4. Record Type Analysis
         print(f"\n📋 Record Type Distribution:")
-        if 'recordType' in self.data.columns:
-            type_counts = self.data['recordType'].value_counts()
-            for record_type, count in type_counts.items():
+        if 'recordType' in self.data.column_names:
+            type_counts = pc.value_counts(pc.drop_null(self.data['recordType'])).to_pylist()
+            type_counts.sort(key=lambda entry: entry['counts'], reverse=True)
+            for entry in type_counts:
+                record_type, count = entry['values'], entry['counts']
                 pct = (count / total_records) * 100
                 print(f"  {record_type}: {count:,} ({pct:.1f}%)")
         else:
@@ -136,16 +160,16 @@ class SimpleHealthChecker:
         
         # 5. Feature Data Analysis
         print(f"\n🔢 Feature Data Analysis:")
-        if 'features' in self.data.columns:
-            features_available = self.data['features'].notna().sum()
+        if 'features' in self.data.column_names:
+            features_available = self.non_null_count('features')
             features_rate = (features_available / total_records) * 100
             print(f"  Records with features: {features_available:,}/{total_records:,} ({features_rate:.1f}%)")
             
             # Check if features are arrays/lists
-            sample_feature = self.data['features'].dropna().iloc[0] if features_available > 0 else None
+            sample_feature = pc.drop_null(self.data['features'])[0].as_py() if features_available > 0 else None
             if sample_feature is not None:
                 try:
-                    if isinstance(sample_feature, (list, np.ndarray)):
+                    if isinstance(sample_feature, list):
                         feature_length = len(sample_feature)
                         print(f"  Feature vector length: {feature_length}")
                     else:
@@ -166,7 +190,7 @@ class SimpleHealthChecker:
             print("❌ No data available")
             return False
         
-        total_records = len(self.data)
+        total_records = self.data.num_rows
         issues = []
         score = 0
         max_score = 100
@@ -180,11 +204,11 @@ class SimpleHealthChecker:
             issues.append("Insufficient data volume")
         
         # Check 2: PnL data quality (30 points)
-        if 'pnl' in self.data.columns:
-            pnl_data = self.data['pnl'].dropna()
+        if 'pnl' in self.data.column_names:
+            pnl_data = pc.drop_null(self.data['pnl'])
             if len(pnl_data) >= 500:
-                pnl_std = pnl_data.std()
-                unique_pnls = pnl_data.nunique()
+                pnl_std = pc.stddev(pnl_data, ddof=1).as_py()
+                unique_pnls = pc.count_distinct(pnl_data).as_py()
                 
                 if pnl_std > 5 and unique_pnls >= 20:
                     score += 30
@@ -201,8 +225,8 @@ class SimpleHealthChecker:
             issues.append("Missing PnL data")
         
         # Check 3: Feature availability (25 points)
-        if 'features' in self.data.columns:
-            features_available = self.data['features'].notna().sum()
+        if 'features' in self.data.column_names:
+            features_available = self.non_null_count('features')
             feature_rate = (features_available / total_records) * 100
             
             if feature_rate >= 80:
@@ -220,15 +244,16 @@ class SimpleHealthChecker:
             issues.append("Missing features")
         
         # Check 4: Instrument/Direction balance (25 points)
-        if 'instrument' in self.data.columns and 'direction' in self.data.columns:
-            combinations = self.data.groupby(['instrument', 'direction']).size()
+        if 'instrument' in self.data.column_names and 'direction' in self.data.column_names:
+            combinations = self.keyed_instrument_direction().group_by(['instrument', 'direction']).aggregate([([], 'count_all')])
+            min_combo = pc.min(combinations['count_all']).as_py() if combinations.num_rows > 0 else 0
             
-            if len(combinations) >= 2 and combinations.min() >= 100:
+            if len(combinations) >= 2 and min_combo >= 100:
                 score += 25
-                print(f"✅ Data Balance: {len(combinations)} combos, min {combinations.min():,} each")
+                print(f"✅ Data Balance: {len(combinations)} combos, min {min_combo:,} each")
             elif len(combinations) >= 2:
                 score += 15
-                print(f"⚠️  Data Balance: {len(combinations)} combos, min {combinations.min()} each")
+                print(f"⚠️  Data Balance: {len(combinations)} combos, min {min_combo} each")
                 issues.append("Unbalanced data distribution")
             else:
                 print(f"❌ Data Balance: Only {len(combinations)} combinations")
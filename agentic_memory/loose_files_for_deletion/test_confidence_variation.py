@@ -2,6 +2,7 @@
 """Test confidence calculation variation"""
 
 import numpy as np
+from numba import njit
 
 def calculate_confidence_old(pnl_std, trajectory_std=None, pnl_mean=0):
     """Old confidence calculation"""
@@ -22,8 +23,9 @@ def calculate_confidence_old(pnl_std, trajectory_std=None, pnl_mean=0):
     
     return max(0.1, min(0.95, confidence))
 
-def calculate_confidence_new(pnl_std, trajectory_std=None, pnl_mean=0, sample_count=100):
-    """New confidence calculation"""
+@njit(cache=True, fastmath=True)
+def calculate_confidence_new(pnl_std, trajectory_std=None, pnl_mean=0.0, sample_count=100):
+    """New confidence calculation (nopython - compiled once, cached on disk)"""
     # 1. Uncertainty component
     if pnl_std < 20:
         uncertainty_confidence = 0.9 - (pnl_std / 20) * 0.2
@@ -67,8 +69,9 @@ def calculate_confidence_new(pnl_std, trajectory_std=None, pnl_mean=0, sample_co
                  0.45 * return_confidence + 
                  0.20 * model_confidence)
     
-    # Add noise
-    noise = (hash(str(pnl_mean) + str(pnl_std)) % 100 - 50) / 5000.0
+    # Add noise - deterministic integer mix of the inputs instead of hash(str(...))
+    key = np.int64(pnl_mean * 1000.0) ^ (np.int64(pnl_std * 1000.0) * np.int64(2654435761))
+    noise = (key % 100 - 50) / 5000.0
     confidence += noise
     
     return max(0.1, min(0.95, confidence))
@@ -3,11 +3,16 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import polars as pl
+from numba import njit, prange
 from datetime import datetime, timedelta
 import json
-import uuid
+import zlib
 from typing import Dict, List, Any
 
+# Column selections share memory until written, so filtered views never deep-copy
+pd.options.mode.copy_on_write = True
+
 # Set page configuration
 st.set_page_config(
     page_title="🚀 Backtest Repository",
@@ -43,80 +48,109 @@ def generate_mock_backtest_data():
     ]
     
     instruments = ["MGC", "ES", "NQ", "GC", "CL"]
+    entry_types = ["ORDER_FLOW_IMBALANCE", "EMA_CROSSOVER", "RSI_DIVERGENCE", "VWAP_REVERSION", "BREAKOUT_PATTERN", "MOMENTUM_SWING"]
+    hierarchy = get_health_hierarchy()
     
-    data = []
-    for i in range(150):  # Generate 150 mock backtests
-        strategy = np.random.choice(strategies)
-        instrument = np.random.choice(instruments)
-        
-        # Generate correlated performance metrics
-        base_performance = np.random.normal(0, 1)
-        
-        net_profit = base_performance * 2000 + np.random.normal(0, 500)
-        sharpe_ratio = max(0.1, base_performance * 0.5 + 1.2 + np.random.normal(0, 0.3))
-        win_rate = max(0.2, min(0.9, 0.55 + base_performance * 0.1 + np.random.normal(0, 0.05)))
-        profit_factor = max(0.5, 1.0 + base_performance * 0.3 + np.random.normal(0, 0.2))
-        max_drawdown = abs(net_profit * 0.3 + np.random.normal(0, 200))
-        
-        # Calculate composite score
-        profit_score = min(max((net_profit + 2000) / 4000, 0), 1)
-        sharpe_score = min(max((sharpe_ratio - 0.5) / 2.0, 0), 1)
-        win_rate_score = win_rate
-        drawdown_penalty = min(max_drawdown / 3000, 1)
-        
-        composite_score = (profit_score * 0.3 + sharpe_score * 0.4 + 
-                          win_rate_score * 0.2 + (1 - drawdown_penalty) * 0.1)
-        composite_score = min(max(composite_score, 0), 1)
-        
-        # Performance state based on composite score
-        if composite_score >= 0.8:
-            health = "excellent"
-        elif composite_score >= 0.65:
-            health = "good"
-        elif composite_score >= 0.5:
-            health = "fair"
-        else:
-            health = "poor"
-        
-        # Generate strategy parameters
-        stop_loss = np.random.choice([10, 15, 20, 25, 30])
-        take_profit = np.random.choice([15, 20, 25, 30, 40, 50])
-        
-        session_id = f"{strategy}_{instrument}_{uuid.uuid4().hex[:8]}"
-        
-        # Generate entry types and timeframe
-        entry_types = ["ORDER_FLOW_IMBALANCE", "EMA_CROSSOVER", "RSI_DIVERGENCE", "VWAP_REVERSION", "BREAKOUT_PATTERN", "MOMENTUM_SWING"]
-        entry_type = np.random.choice(entry_types)
-        
-        # Generate timestamp with realistic year spread
-        timestamp = datetime.now() - timedelta(days=np.random.randint(1, 1095))  # Up to 3 years back
-        year = timestamp.year
-        
-        data.append({
-            'sessionId': session_id,
-            'strategyName': strategy,
-            'instrument': instrument,
-            'entryType': entry_type,
-            'timestamp': timestamp,
-            'year': year,
-            'isFavorited': session_id in st.session_state.favorites,
-            'overallHealth': health,
-            'netProfit': round(net_profit, 2),
-            'sharpeRatio': round(sharpe_ratio, 2),
-            'winRate': round(win_rate, 3),
-            'profitFactor': round(profit_factor, 2),
-            'maxDrawdown': round(max_drawdown, 2),
-            'compositeScore': round(composite_score, 3),
-            'totalTrades': np.random.randint(50, 500),
-            'stopLoss': stop_loss,
-            'takeProfit': take_profit,
-            'wickRatio': round(np.random.uniform(0.1, 0.4), 2),
-            'volumeMultiplier': round(np.random.uniform(1.2, 3.0), 1),
-            'rsiLevel': np.random.choice([20, 25, 30, 70, 75, 80]),
-            'topFeatures': f"wickRatio({np.random.uniform(0.7, 0.9):.2f}), stopLoss({np.random.uniform(0.6, 0.8):.2f}), rsiLevel({np.random.uniform(0.5, 0.7):.2f})"
-        })
-    
-    return pd.DataFrame(data)
+    n_rows = 150  # Generate 150 mock backtests
+    rng = np.random.default_rng()
+    
+    # Low-cardinality labels as categoricals so filters and groupbys work on integer codes;
+    # fixed category lists keep the codes stable across refreshes and health ordered by rank
+    strategy_dtype = pd.CategoricalDtype(sorted(strategies))
+    instrument_dtype = pd.CategoricalDtype(sorted(instruments))
+    entry_type_dtype = pd.CategoricalDtype(sorted(entry_types))
+    health_dtype = pd.CategoricalDtype(sorted(hierarchy, key=hierarchy.get), ordered=True)
+    
+    # Draw category codes directly and index the label arrays, no per-row string hashing
+    strategy_codes = rng.integers(0, len(strategy_dtype.categories), n_rows)
+    instrument_codes = rng.integers(0, len(instrument_dtype.categories), n_rows)
+    strategy = strategy_dtype.categories.to_numpy()[strategy_codes]
+    instrument = instrument_dtype.categories.to_numpy()[instrument_codes]
+    
+    # Generate correlated performance metrics
+    base_performance = rng.standard_normal(n_rows)
+    
+    net_profit = base_performance * 2000 + rng.normal(0, 500, n_rows)
+    sharpe_ratio = np.maximum(0.1, base_performance * 0.5 + 1.2 + rng.normal(0, 0.3, n_rows))
+    win_rate = np.clip(0.55 + base_performance * 0.1 + rng.normal(0, 0.05, n_rows), 0.2, 0.9)
+    profit_factor = np.maximum(0.5, 1.0 + base_performance * 0.3 + rng.normal(0, 0.2, n_rows))
+    max_drawdown = np.abs(net_profit * 0.3 + rng.normal(0, 200, n_rows))
+    
+    # Calculate composite score
+    profit_score = np.clip((net_profit + 2000) / 4000, 0, 1)
+    sharpe_score = np.clip((sharpe_ratio - 0.5) / 2.0, 0, 1)
+    win_rate_score = win_rate
+    drawdown_penalty = np.minimum(max_drawdown / 3000, 1)
+    
+    composite_score = (profit_score * 0.3 + sharpe_score * 0.4 + 
+                      win_rate_score * 0.2 + (1 - drawdown_penalty) * 0.1)
+    composite_score = np.clip(composite_score, 0, 1)
+    
+    # Performance state based on composite score
+    health_conditions = [composite_score >= 0.8, composite_score >= 0.65, composite_score >= 0.5]
+    health_rank = np.select(
+        health_conditions,
+        [hierarchy["excellent"], hierarchy["good"], hierarchy["fair"]],
+        default=hierarchy["poor"]
+    ).astype(np.int8)
+    
+    session_id = pd.Series(strategy) + "_" + instrument + "_" + np.char.mod('%08x', rng.integers(0, 2**32, n_rows))
+    
+    # Generate timestamp with realistic year spread
+    timestamp = pd.Timestamp(datetime.now()) - pd.to_timedelta(rng.integers(1, 1095, n_rows), unit='D')  # Up to 3 years back
+    
+    # Feature importance summary drawn and formatted for all rows at once
+    wick_importance = np.char.mod('%.2f', rng.uniform(0.7, 0.9, n_rows))
+    stop_importance = np.char.mod('%.2f', rng.uniform(0.6, 0.8, n_rows))
+    rsi_importance = np.char.mod('%.2f', rng.uniform(0.5, 0.7, n_rows))
+    
+    # Build the frame column-wise in one shot
+    df = pd.DataFrame({
+        'sessionId': session_id,
+        'seed': np.array([zlib.crc32(sid.encode('ascii')) for sid in session_id], dtype=np.uint32),  # Stable across restarts, unlike hash()
+        'strategyName': pd.Categorical.from_codes(strategy_codes, dtype=strategy_dtype),
+        'instrument': pd.Categorical.from_codes(instrument_codes, dtype=instrument_dtype),
+        'entryType': pd.Categorical.from_codes(
+            rng.integers(0, len(entry_type_dtype.categories), n_rows), dtype=entry_type_dtype
+        ),
+        'timestamp': timestamp,
+        'year': timestamp.year.astype(np.int16),
+        'overallHealth': pd.Categorical.from_codes(health_rank - 1, dtype=health_dtype),
+        'healthRank': health_rank,
+        'netProfit': np.round(net_profit, 2).astype(np.float32),
+        'sharpeRatio': np.round(sharpe_ratio, 2).astype(np.float32),
+        'winRate': np.round(win_rate, 3).astype(np.float32),
+        'profitFactor': np.round(profit_factor, 2).astype(np.float32),
+        'maxDrawdown': np.round(max_drawdown, 2).astype(np.float32),
+        # Kept float64: compared against the 0.8 / 0.65 / 0.5 health and colour thresholds
+        'compositeScore': np.round(composite_score, 3),
+        'totalTrades': rng.integers(50, 500, n_rows, dtype=np.int16),
+        'stopLoss': rng.choice(np.array([10, 15, 20, 25, 30], dtype=np.int16), n_rows),
+        'takeProfit': rng.choice(np.array([15, 20, 25, 30, 40, 50], dtype=np.int16), n_rows),
+        'wickRatio': np.round(rng.uniform(0.1, 0.4, n_rows), 2).astype(np.float32),
+        'volumeMultiplier': np.round(rng.uniform(1.2, 3.0, n_rows), 1).astype(np.float32),
+        'rsiLevel': rng.choice(np.array([20, 25, 30, 70, 75, 80], dtype=np.int8), n_rows),
+        'topFeatures': (
+            "wickRatio(" + pd.Series(wick_importance) + "), stopLoss(" + stop_importance +
+            "), rsiLevel(" + rsi_importance + ")"
+        )
+    })
+    
+    # Arrow-backed session ids plus a lowercased copy for literal substring search
+    df['sessionId'] = df['sessionId'].astype('string[pyarrow]')
+    df['_sessionIdLower'] = df['sessionId'].str.lower()
+    return df
+
+def load_backtest_data():
+    """Load cached backtest data and overlay the live favorites state"""
+    df = generate_mock_backtest_data()
+    df.insert(
+        df.columns.get_loc('overallHealth'), 'isFavorited',
+        df['sessionId'].isin(st.session_state.favorites)
+    )
+    # Single ascending key for "favorites first, then highest composite score"
+    df['_sortKey'] = -(df['isFavorited'].to_numpy(dtype=np.float64) * 2 + df['compositeScore'].to_numpy())
+    return df
 
 # Helper Functions
 def get_health_hierarchy():
@@ -128,75 +162,159 @@ def get_health_hierarchy():
         "poor": 1
     }
 
-def filter_by_minimum_health(df, min_health):
-    """Filter dataframe by minimum health level"""
-    if min_health == "All":
-        return df
-    
-    hierarchy = get_health_hierarchy()
-    min_level = hierarchy[min_health]
-    
-    return df[df['overallHealth'].map(hierarchy) >= min_level]
-
-def get_color_scale(score):
-    """Convert composite score to color"""
-    if score >= 0.8:
-        return "🟢"
-    elif score >= 0.65:
-        return "🟡"
-    elif score >= 0.5:
-        return "🟠"
-    else:
-        return "🔴"
+def category_mask(series, value):
+    """Equality mask for a categorical column, compared on its integer codes"""
+    categories = series.cat.categories
+    if value not in categories:
+        return np.zeros(len(series), dtype=bool)
+    return series.cat.codes.to_numpy() == categories.get_loc(value)
 
-def generate_realistic_equity_curve(session_data):
-    """Generate realistic equity curve based on actual session performance"""
-    np.random.seed(hash(session_data['sessionId']) % 2**32)
-    
-    num_trades = session_data['totalTrades']
-    starting_capital = 10000
-    win_rate = session_data['winRate']
-    net_profit = session_data['netProfit']
-    max_drawdown = session_data['maxDrawdown']
-    
-    # More realistic trade distribution
-    avg_win = net_profit / (num_trades * win_rate) if win_rate > 0 else 100
-    avg_loss = -max_drawdown / (num_trades * (1 - win_rate)) if win_rate < 1 else -50
-    
-    # Create realistic trade sequence with streaks and volatility
-    trades_pnl = []
+HEALTH_EMOJI = {"excellent": "🟢", "good": "🟡", "fair": "🟠", "poor": "🔴"}
+
+# Trade size multipliers with cumulative probabilities for inverse-CDF draws
+WIN_MULTIPLIERS = np.array([0.5, 1.0, 1.5, 2.0, 3.0])
+WIN_CUM_PROBS = np.array([0.3, 0.7, 0.9, 0.98, 1.0])
+LOSS_MULTIPLIERS = np.array([0.8, 1.0, 1.5, 2.5])
+LOSS_CUM_PROBS = np.array([0.5, 0.8, 0.95, 1.0])
+
+@njit(cache=True)
+def _simulate_trades(win_rate, avg_win, avg_loss, uniforms, noise, win_multipliers, loss_multipliers):
+    """Simulate a trade PnL sequence with loss streaks from pre-drawn variates (compiled trade loop)"""
+    num_trades = uniforms.shape[0]
+    trades_pnl = np.empty(num_trades)
     consecutive_losses = 0
     
     for i in range(num_trades):
         # Increase loss probability after consecutive losses (realistic psychology)
         adjusted_win_rate = max(0.2, win_rate - (consecutive_losses * 0.05))
         
-        if np.random.random() < adjusted_win_rate:
+        if uniforms[i] < adjusted_win_rate:
             # Win - vary size significantly
-            win_multiplier = np.random.choice([0.5, 1.0, 1.5, 2.0, 3.0], p=[0.3, 0.4, 0.2, 0.08, 0.02])
-            trade_pnl = abs(avg_win) * win_multiplier + np.random.normal(0, abs(avg_win) * 0.4)
+            trades_pnl[i] = abs(avg_win) * win_multipliers[i] + noise[i] * abs(avg_win) * 0.4
             consecutive_losses = 0
         else:
             # Loss - occasional large losses
-            loss_multiplier = np.random.choice([0.8, 1.0, 1.5, 2.5], p=[0.5, 0.3, 0.15, 0.05])
-            trade_pnl = avg_loss * loss_multiplier + np.random.normal(0, abs(avg_loss) * 0.3)
+            trades_pnl[i] = avg_loss * loss_multipliers[i] + noise[i] * abs(avg_loss) * 0.3
             consecutive_losses += 1
+    
+    return trades_pnl
+
+def _draw_trade_variates(num_trades, rng):
+    """Draw the uniforms, noise and size multipliers for one session's trades"""
+    uniforms = rng.random(num_trades)
+    noise = rng.standard_normal(num_trades)
+    size_draws = rng.random(num_trades)
+    win_multipliers = WIN_MULTIPLIERS[np.searchsorted(WIN_CUM_PROBS, size_draws, side='right')]
+    loss_multipliers = LOSS_MULTIPLIERS[np.searchsorted(LOSS_CUM_PROBS, size_draws, side='right')]
+    return uniforms, noise, win_multipliers, loss_multipliers
+
+def simulate_trades(num_trades, win_rate, avg_win, avg_loss, rng):
+    """Bulk-draw all random variates, then run the compiled trade loop"""
+    return _simulate_trades(win_rate, avg_win, avg_loss, *_draw_trade_variates(num_trades, rng))
+
+@njit(parallel=True, cache=True)
+def _simulate_equity_batch(win_rates, avg_wins, avg_losses, trade_offsets,
+                           uniforms, noise, win_multipliers, loss_multipliers, starting_capital):
+    """Simulate many sessions' equity and drawdown in parallel into flat buffers"""
+    n_sessions = win_rates.shape[0]
+    # Each session's curve has one leading starting-capital point ahead of its trades
+    equity = np.empty(trade_offsets[-1] + n_sessions)
+    drawdown = np.empty_like(equity)
+    
+    for s in prange(n_sessions):
+        start, end = trade_offsets[s], trade_offsets[s + 1]
+        trades_pnl = _simulate_trades(
+            win_rates[s], avg_wins[s], avg_losses[s], uniforms[start:end], noise[start:end],
+            win_multipliers[start:end], loss_multipliers[start:end]
+        )
         
-        trades_pnl.append(trade_pnl)
+        out = start + s
+        balance = starting_capital
+        running_high = starting_capital
+        equity[out] = balance
+        drawdown[out] = 0.0
+        for i in range(end - start):
+            balance += trades_pnl[i]
+            running_high = max(running_high, balance)
+            equity[out + i + 1] = balance
+            drawdown[out + i + 1] = running_high - balance
+    
+    return equity, drawdown
+
+def simulate_equity_batch(sessions_df, starting_capital=10000):
+    """Simulate equity curves for several sessions at once, keyed by sessionId"""
+    num_trades = sessions_df['totalTrades'].to_numpy(dtype=np.int64)
+    win_rate = sessions_df['winRate'].to_numpy(dtype=np.float64)
+    net_profit = sessions_df['netProfit'].to_numpy(dtype=np.float64)
+    max_drawdown = sessions_df['maxDrawdown'].to_numpy(dtype=np.float64)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_win = np.where(win_rate > 0, net_profit / (num_trades * win_rate), 100.0)
+        avg_loss = np.where(win_rate < 1, -max_drawdown / (num_trades * (1 - win_rate)), -50.0)
+    
+    # Per-session generators keep each curve identical to its single-session view
+    variates = [
+        _draw_trade_variates(n, np.random.default_rng(seed))
+        for n, seed in zip(num_trades, sessions_df['seed'])
+    ]
+    trade_offsets = np.concatenate(([0], np.cumsum(num_trades)))
+    uniforms, noise, win_multipliers, loss_multipliers = (
+        np.concatenate([v[k] for v in variates]) if variates else np.empty(0) for k in range(4)
+    )
     
-    # Calculate cumulative equity with more realistic patterns
-    cumulative_equity = [starting_capital]
-    running_high = starting_capital
+    equity, drawdown = _simulate_equity_batch(
+        win_rate, avg_win, avg_loss, trade_offsets,
+        uniforms, noise, win_multipliers, loss_multipliers, float(starting_capital)
+    )
+    
+    return {
+        session_id: (
+            equity[trade_offsets[i] + i:trade_offsets[i + 1] + i + 1],
+            drawdown[trade_offsets[i] + i:trade_offsets[i + 1] + i + 1]
+        )
+        for i, session_id in enumerate(sessions_df['sessionId'])
+    }
+
+# Compile (or load the cached build) at import rather than on the first session click
+simulate_trades(1, 0.5, 1.0, -1.0, np.random.default_rng(0))
+
+def _equity_curve_args(session_data):
+    """Extract the hashable fields that key the equity curve caches"""
+    return (
+        session_data['sessionId'],
+        int(session_data['seed']),
+        int(session_data['totalTrades']),
+        float(session_data['winRate']),
+        float(session_data['netProfit']),
+        float(session_data['maxDrawdown']),
+        pd.Timestamp(session_data['timestamp']).isoformat()
+    )
+
+@st.cache_data(max_entries=128)
+def _equity_curve_cached(session_id, seed, num_trades, win_rate, net_profit, max_drawdown, timestamp_iso):
+    """Cached equity curve simulation keyed on hashable session fields"""
+    starting_capital = 10000
     
-    for pnl in trades_pnl:
-        new_equity = cumulative_equity[-1] + pnl
-        cumulative_equity.append(new_equity)
-        running_high = max(running_high, new_equity)
+    # More realistic trade distribution
+    avg_win = net_profit / (num_trades * win_rate) if win_rate > 0 else 100
+    avg_loss = -max_drawdown / (num_trades * (1 - win_rate)) if win_rate < 1 else -50
+    
+    # Create realistic trade sequence with streaks and volatility
+    trades_pnl = simulate_trades(
+        num_trades, win_rate, float(avg_win), float(avg_loss),
+        np.random.default_rng(seed)
+    )
+    
+    # Calculate cumulative equity, running high and drawdown in O(N)
+    cumulative_equity = np.concatenate(([starting_capital], starting_capital + np.cumsum(trades_pnl)))
+    running_high = np.maximum.accumulate(cumulative_equity)
+    drawdown = np.maximum(running_high - cumulative_equity, 0)
     
     # Generate timestamps for trades (spread over time realistically)
+    timestamp = pd.Timestamp(timestamp_iso)
     trade_dates = pd.date_range(
-        start=session_data['timestamp'] - timedelta(days=30),
-        end=session_data['timestamp'],
+        start=timestamp - timedelta(days=30),
+        end=timestamp,
         periods=len(cumulative_equity)
     )
     
@@ -204,15 +322,85 @@ def generate_realistic_equity_curve(session_data):
         'Trade': range(len(cumulative_equity)),
         'Date': trade_dates,
         'Equity': cumulative_equity,
-        'Drawdown': [max(0, max(cumulative_equity[:i+1]) - eq) for i, eq in enumerate(cumulative_equity)],
-        'PnL': [0] + trades_pnl,
-        'RunningHigh': [max(cumulative_equity[:i+1]) for i in range(len(cumulative_equity))]
+        'Drawdown': drawdown,
+        'PnL': np.concatenate(([0.0], trades_pnl)),
+        'RunningHigh': running_high
     })
 
+@st.cache_resource(max_entries=64)
+def _build_equity_fig(session_id, seed, num_trades, win_rate, net_profit, max_drawdown, timestamp_iso):
+    """Build the session equity figure once and reuse it across reruns"""
+    equity_df = _equity_curve_cached(session_id, seed, num_trades, win_rate, net_profit, max_drawdown, timestamp_iso)
+    
+    # Create advanced equity chart
+    fig_equity = go.Figure()
+    
+    # Equity line
+    fig_equity.add_trace(go.Scatter(
+        x=equity_df['Date'],
+        y=equity_df['Equity'],
+        mode='lines',
+        name='Equity',
+        line=dict(color='blue', width=2),
+        hovertemplate='<b>Date:</b> %{x}<br><b>Equity:</b> $%{y:,.2f}<br><b>Trade PnL:</b> $%{customdata:,.2f}<extra></extra>',
+        customdata=equity_df['PnL']
+    ))
+    
+    # Running high (for drawdown reference)
+    fig_equity.add_trace(go.Scatter(
+        x=equity_df['Date'],
+        y=equity_df['RunningHigh'],
+        mode='lines',
+        name='Running High',
+        line=dict(color='green', width=1, dash='dot'),
+        opacity=0.7
+    ))
+    
+    # Underwater curve
+    underwater = -(equity_df['Equity'] - equity_df['RunningHigh'])
+    fig_equity.add_trace(go.Scatter(
+        x=equity_df['Date'],
+        y=underwater,
+        mode='lines',
+        fill='tozeroy',
+        name='Drawdown',
+        line=dict(color='red', width=0),
+        fillcolor='rgba(255,0,0,0.3)',
+        yaxis='y2'
+    ))
+    
+    fig_equity.update_layout(
+        title=f"Equity Curve - {session_id}",
+        xaxis_title="Date",
+        yaxis_title="Account Equity ($)",
+        yaxis2=dict(
+            title="Drawdown ($)",
+            overlaying="y",
+            side="right",
+            range=[min(underwater) * 1.1, 0]
+        ),
+        height=350,
+        showlegend=True,
+        hovermode='x unified'
+    )
+    
+    return fig_equity
+
+# Static mock feature importances shown in the session footer
+FEATURE_IMPORTANCE = pd.DataFrame({
+    'Feature': ['wickRatio', 'stopLoss', 'rsiLevel', 'volumeMultiplier', 'takeProfit'],
+    'Importance': [0.85, 0.72, 0.68, 0.55, 0.45]
+})
+
 def render_session_footer(df):
     """Render session details as a footer across all tabs"""
     if st.session_state.selected_session is not None:
-        session_data = df[df['sessionId'] == st.session_state.selected_session].iloc[0]
+        # Materialise the selected row once as a plain dict; every field read below is a dict lookup
+        matches = np.flatnonzero(df['sessionId'].to_numpy() == st.session_state.selected_session)
+        if len(matches) == 0:
+            st.session_state.selected_session = None
+            return
+        session_data = df.iloc[matches[0]].to_dict()
         
         st.markdown("---")
         st.markdown("### 📊 Selected Session Details")
@@ -231,59 +419,10 @@ def render_session_footer(df):
         
         with session_tab1:
             # Generate realistic equity curve
-            equity_df = generate_realistic_equity_curve(session_data)
-            
-            # Create advanced equity chart
-            fig_equity = go.Figure()
-            
-            # Equity line
-            fig_equity.add_trace(go.Scatter(
-                x=equity_df['Date'],
-                y=equity_df['Equity'],
-                mode='lines',
-                name='Equity',
-                line=dict(color='blue', width=2),
-                hovertemplate='<b>Date:</b> %{x}<br><b>Equity:</b> $%{y:,.2f}<br><b>Trade PnL:</b> $%{customdata:,.2f}<extra></extra>',
-                customdata=equity_df['PnL']
-            ))
-            
-            # Running high (for drawdown reference)
-            fig_equity.add_trace(go.Scatter(
-                x=equity_df['Date'],
-                y=equity_df['RunningHigh'],
-                mode='lines',
-                name='Running High',
-                line=dict(color='green', width=1, dash='dot'),
-                opacity=0.7
-            ))
+            curve_args = _equity_curve_args(session_data)
+            equity_df = _equity_curve_cached(*curve_args)
             
-            # Underwater curve
-            underwater = -(equity_df['Equity'] - equity_df['RunningHigh'])
-            fig_equity.add_trace(go.Scatter(
-                x=equity_df['Date'],
-                y=underwater,
-                mode='lines',
-                fill='tozeroy',
-                name='Drawdown',
-                line=dict(color='red', width=0),
-                fillcolor='rgba(255,0,0,0.3)',
-                yaxis='y2'
-            ))
-            
-            fig_equity.update_layout(
-                title=f"Equity Curve - {session_data['sessionId']}",
-                xaxis_title="Date",
-                yaxis_title="Account Equity ($)",
-                yaxis2=dict(
-                    title="Drawdown ($)",
-                    overlaying="y",
-                    side="right",
-                    range=[min(underwater) * 1.1, 0]
-                ),
-                height=350,
-                showlegend=True,
-                hovermode='x unified'
-            )
+            fig_equity = _build_equity_fig(*curve_args)
             
             st.plotly_chart(fig_equity, use_container_width=True)
             
@@ -318,12 +457,9 @@ def render_session_footer(df):
         
         with session_tab3:
             # Feature importance
-            feature_data = pd.DataFrame({
-                'Feature': ['wickRatio', 'stopLoss', 'rsiLevel', 'volumeMultiplier', 'takeProfit'],
-                'Importance': [0.85, 0.72, 0.68, 0.55, 0.45],
-                'Value': [session_data['wickRatio'], session_data['stopLoss'], 
-                         session_data['rsiLevel'], session_data['volumeMultiplier'], session_data['takeProfit']]
-            })
+            feature_data = FEATURE_IMPORTANCE.assign(
+                Value=[session_data[feature] for feature in FEATURE_IMPORTANCE['Feature']]
+            )
             
             fig_features = px.bar(feature_data, x='Feature', y='Importance', 
                                 text='Value',
@@ -351,7 +487,29 @@ def render_session_footer(df):
                     st.success("Parameters copied for new backtest!")
             with action_col3:
                 if st.button("📊 Similar Sessions", key="footer_similar"):
-                    st.info("Would find similar parameter combinations...")
+                    # Same instrument and SL/TP grid cell, best scores first
+                    similar_df = df[
+                        (df['instrument'] == session_data['instrument']) &
+                        (df['stopLoss'] == session_data['stopLoss']) &
+                        (df['takeProfit'] == session_data['takeProfit'])
+                    ].nlargest(10, 'compositeScore')
+                    
+                    curves = simulate_equity_batch(similar_df)
+                    fig_similar = go.Figure()
+                    for session_id, (equity, _) in curves.items():
+                        fig_similar.add_trace(go.Scatter(
+                            y=equity,
+                            mode='lines',
+                            name=session_id[-8:],
+                            line=dict(width=3 if session_id == session_data['sessionId'] else 1)
+                        ))
+                    fig_similar.update_layout(
+                        title=f"Similar Sessions - {session_data['instrument']} SL {session_data['stopLoss']} / TP {session_data['takeProfit']}",
+                        xaxis_title="Trade",
+                        yaxis_title="Account Equity ($)",
+                        height=350
+                    )
+                    st.plotly_chart(fig_similar, use_container_width=True)
 
 def render_performance_heatmap(df):
     """Render gradient analysis heatmaps for all instruments"""
@@ -369,7 +527,9 @@ def render_performance_heatmap(df):
         [1.0, "#ADD8E6"]     # Light blue
     ]
     
-    instruments = sorted(df['instrument'].unique())
+    # Partition by instrument once rather than masking the full frame per heatmap
+    instrument_groups = dict(tuple(df.groupby('instrument', observed=True)))
+    instruments = sorted(instrument_groups)
     
     # Calculate grid layout based on number of instruments
     n_instruments = len(instruments)
@@ -380,74 +540,19 @@ def render_performance_heatmap(df):
         
         for j, instrument in enumerate(instruments[i:i+cols_per_row]):
             with cols[j]:
-                create_instrument_heatmap(df, instrument, color_metric, custom_colorscale)
+                create_instrument_heatmap(instrument_groups[instrument], instrument, color_metric, custom_colorscale)
 
-def create_instrument_heatmap(df, instrument, color_metric, custom_colorscale):
-    """Create a single heatmap for one instrument"""
-    instrument_df = df[df['instrument'] == instrument]
-    
-    if len(instrument_df) == 0:
-        st.warning(f"No data for {instrument}")
-        return
+@st.cache_resource(max_entries=64)
+def _build_heatmap_fig(instrument, color_metric, heatmap_bytes, shape, sl_labels, tp_labels, custom_colorscale):
+    """Build one instrument heatmap figure from hashable cell data"""
+    z = np.frombuffer(heatmap_bytes, dtype=np.float64).reshape(shape)
     
-    # Create grid data for Stop Loss vs Take Profit
-    grid_data = []
-    sl_values = sorted(instrument_df['stopLoss'].unique())
-    tp_values = sorted(instrument_df['takeProfit'].unique())
-    
-    for sl in sl_values:
-        for tp in tp_values:
-            subset = instrument_df[
-                (instrument_df['stopLoss'] == sl) & 
-                (instrument_df['takeProfit'] == tp)
-            ]
-            if len(subset) > 0:
-                avg_performance = subset[color_metric].mean()
-                count = len(subset)
-                
-                grid_data.append({
-                    'stopLoss': sl,
-                    'takeProfit': tp,
-                    'performance': avg_performance,
-                    'count': count
-                })
-    
-    if not grid_data:
-        st.warning(f"No combinations for {instrument}")
-        return
-    
-    grid_df = pd.DataFrame(grid_data)
-    
-    # Create pivot table
-    heatmap_data = grid_df.pivot_table(
-        index='takeProfit', 
-        columns='stopLoss', 
-        values='performance', 
-        aggfunc='mean'
-    )
-    
-    # Calculate tile size based on data density
-    max_tests = grid_df['count'].max()
-    min_tests = grid_df['count'].min()
-    
-    # Create count matrix for tile sizing
-    count_data = grid_df.pivot_table(
-        index='takeProfit',
-        columns='stopLoss', 
-        values='count',
-        aggfunc='mean'
-    )
-    
-    # Normalize tile sizes (more tests = smaller tiles)
-    tile_sizes = 1.0 - (count_data - min_tests) / (max_tests - min_tests) * 0.5
-    
-    # Create the heatmap
     fig = go.Figure(data=go.Heatmap(
-        z=heatmap_data.values,
-        x=[f"{x}" for x in heatmap_data.columns],
-        y=[f"{y}" for y in heatmap_data.index],
+        z=z,
+        x=list(sl_labels),
+        y=list(tp_labels),
         colorscale=custom_colorscale,
-        text=np.round(heatmap_data.values, 3),
+        text=np.round(z, 3),
         texttemplate="%{text}",
         textfont={"size": 8},
         hovertemplate=f"<b>{instrument}</b><br>" +
@@ -459,7 +564,7 @@ def create_instrument_heatmap(df, instrument, color_metric, custom_colorscale):
     
     # Calculate dynamic height based on data size
     base_height = 200
-    height = max(base_height, min(400, len(tp_values) * 30))
+    height = max(base_height, min(400, len(tp_labels) * 30))
     
     fig.update_layout(
         title=f"{instrument}",
@@ -471,6 +576,35 @@ def create_instrument_heatmap(df, instrument, color_metric, custom_colorscale):
         font=dict(size=10)
     )
     
+    return fig
+
+def create_instrument_heatmap(instrument_df, instrument, color_metric, custom_colorscale):
+    """Create a single heatmap for one instrument"""
+    if len(instrument_df) == 0:
+        st.warning(f"No data for {instrument}")
+        return
+    
+    # Aggregate Stop Loss vs Take Profit cells in a single groupby pass
+    grid_df = instrument_df.groupby(['stopLoss', 'takeProfit'], observed=True)[color_metric].mean().reset_index(
+        name='performance'
+    )
+    
+    if len(grid_df) == 0:
+        st.warning(f"No combinations for {instrument}")
+        return
+    
+    # Create pivot table
+    heatmap_data = grid_df.pivot(index='takeProfit', columns='stopLoss', values='performance')
+    
+    # Create the heatmap (cached on the cell values so reruns reuse the figure)
+    fig = _build_heatmap_fig(
+        instrument, color_metric,
+        heatmap_data.to_numpy(dtype=np.float64).tobytes(), heatmap_data.shape,
+        tuple(f"{x}" for x in heatmap_data.columns),
+        tuple(f"{y}" for y in heatmap_data.index),
+        custom_colorscale
+    )
+    
     # Display heatmap without click handling (not supported in older Streamlit)
     st.plotly_chart(
         fig, 
@@ -513,11 +647,10 @@ def create_instrument_heatmap(df, instrument, color_metric, custom_colorscale):
     # Show gradient quality metrics
     if len(grid_df) > 4:  # Need sufficient data for gradient analysis
         # Calculate gradient smoothness
-        perf_values = heatmap_data.values
-        gradient_x = np.gradient(perf_values, axis=1)
-        gradient_y = np.gradient(perf_values, axis=0) 
-        gradient_magnitude = np.sqrt(gradient_x**2 + gradient_y**2)
-        smoothness = 1.0 / (1.0 + np.nanmean(gradient_magnitude))
+        perf_values = heatmap_data.to_numpy(dtype=np.float32)
+        gradient_y, gradient_x = np.gradient(perf_values)
+        gradient_sq = gradient_x * gradient_x + gradient_y * gradient_y
+        smoothness = 1.0 / (1.0 + float(np.sqrt(np.nanmean(gradient_sq))))
         
         st.metric(
             f"Gradient Quality",
@@ -528,6 +661,7 @@ def create_instrument_heatmap(df, instrument, color_metric, custom_colorscale):
 def render_backtest_table(df):
     """Render interactive backtest results table"""
     st.subheader("📋 Backtest Results")
+    filter_options = st.session_state.filter_options
     
     # Table filters - First row
     col1, col2, col3, col4 = st.columns(4)
@@ -539,19 +673,19 @@ def render_backtest_table(df):
                                    help="Shows selected level and above (e.g., 'good' includes 'good' and 'excellent')")
     with col3:
         strategy_filter = st.selectbox("Strategy Filter", 
-                                     ["All"] + sorted(df['strategyName'].unique().tolist()))
+                                     ["All"] + filter_options['strategyName'])
     with col4:
         instrument_filter = st.selectbox("Instrument Filter", 
-                                       ["All"] + sorted(df['instrument'].unique().tolist()))
+                                       ["All"] + filter_options['instrument'])
     
     # Table filters - Second row
     col5, col6, col7, col8 = st.columns(4)
     with col5:
         entry_type_filter = st.selectbox("Entry Type Filter", 
-                                        ["All"] + sorted(df['entryType'].unique().tolist()))
+                                        ["All"] + filter_options['entryType'])
     with col6:
         year_filter = st.selectbox("Timeframe End (Year)", 
-                                  ["All"] + sorted(df['year'].unique().tolist(), reverse=True))
+                                  ["All"] + filter_options['year'][::-1])
     with col7:
         # SessionID search/filter
         session_search = st.text_input("SessionID Contains", 
@@ -561,22 +695,23 @@ def render_backtest_table(df):
         if st.button("🔄 Clear All Filters"):
             st.rerun()
     
-    # Apply filters
-    filtered_df = df.copy()
+    # Apply filters as a single combined mask
+    mask = np.ones(len(df), dtype=bool)
     if show_favorites:
-        filtered_df = filtered_df[filtered_df['isFavorited'] == True]
+        mask &= df['isFavorited'].to_numpy()
     if health_filter != "All":
-        filtered_df = filter_by_minimum_health(filtered_df, health_filter)
+        mask &= df['healthRank'].to_numpy() >= get_health_hierarchy()[health_filter]
     if strategy_filter != "All":
-        filtered_df = filtered_df[filtered_df['strategyName'] == strategy_filter]
+        mask &= category_mask(df['strategyName'], strategy_filter)
     if instrument_filter != "All":
-        filtered_df = filtered_df[filtered_df['instrument'] == instrument_filter]
+        mask &= category_mask(df['instrument'], instrument_filter)
     if entry_type_filter != "All":
-        filtered_df = filtered_df[filtered_df['entryType'] == entry_type_filter]
+        mask &= category_mask(df['entryType'], entry_type_filter)
     if year_filter != "All":
-        filtered_df = filtered_df[filtered_df['year'] == year_filter]
+        mask &= df['year'].to_numpy() == year_filter
     if session_search:
-        filtered_df = filtered_df[filtered_df['sessionId'].str.contains(session_search, case=False, na=False)]
+        mask &= df['_sessionIdLower'].str.contains(session_search.lower(), regex=False).to_numpy(dtype=bool, na_value=False)
+    filtered_df = df.iloc[np.flatnonzero(mask)]
     
     # Show filter status
     active_filters = []
@@ -595,32 +730,53 @@ def render_backtest_table(df):
     if session_search:
         active_filters.append(f"SessionID: '{session_search}'")
     
-    if active_filters:
-        st.info(f"🔍 **Active Filters:** {' | '.join(active_filters)} | **Showing {len(filtered_df)} of {len(df)} results**")
+    # Sort favorites first, then by composite score (top-K partial select on large result sets)
+    matched_count = len(filtered_df)
+    sort_key = filtered_df['_sortKey'].to_numpy()
+    if matched_count > 500:
+        top = np.argpartition(sort_key, 200)[:200]
+        order = top[np.argsort(sort_key[top], kind='stable')]
     else:
-        st.info(f"📊 **Showing all {len(df)} results** (no filters applied)")
+        order = np.argsort(sort_key, kind='stable')
+    filtered_df = filtered_df.iloc[order]
     
-    # Sort favorites first, then by composite score
-    filtered_df = filtered_df.sort_values(['isFavorited', 'compositeScore'], ascending=[False, False])
+    # Large result sets only render their top rows, so say so alongside the match count
+    clip_note = ""
+    if len(filtered_df) < matched_count:
+        clip_note = (f" | **Table lists the top {len(filtered_df)} by score** "
+                     f"(narrow the filters to see the other {matched_count - len(filtered_df)})")
     
-    # Display table with custom formatting
-    display_df = filtered_df[['sessionId', 'strategyName', 'instrument', 'entryType', 'year',
-                             'overallHealth', 'compositeScore', 'netProfit', 'sharpeRatio', 'winRate', 
-                             'profitFactor', 'topFeatures', 'isFavorited']].copy()
+    if active_filters:
+        st.info(f"🔍 **Active Filters:** {' | '.join(active_filters)} | **Showing {matched_count} of {len(df)} results**{clip_note}")
+    else:
+        st.info(f"📊 **Showing all {len(df)} results** (no filters applied){clip_note}")
     
     # Add visual indicators
-    display_df['Health'] = display_df['overallHealth'].apply(lambda x: 
-        f"🟢 {x}" if x == "excellent" else 
-        f"🟡 {x}" if x == "good" else 
-        f"🟠 {x}" if x == "fair" else f"🔴 {x}")
-    
-    display_df['Score'] = display_df['compositeScore'].apply(lambda x: f"{get_color_scale(x)} {x:.3f}")
-    display_df['Profit'] = display_df['netProfit'].apply(lambda x: f"${x:,.0f}")
-    display_df['Favorite'] = display_df['isFavorited'].apply(lambda x: "⭐" if x else "☆")
-    
-    # Select columns for display
-    final_df = display_df[['sessionId', 'strategyName', 'instrument', 'entryType', 'year', 'Health', 
-                          'Score', 'Profit', 'sharpeRatio', 'winRate', 'topFeatures', 'Favorite']]
+    # Relabel the handful of health categories rather than formatting every row
+    health = filtered_df['overallHealth'].cat.rename_categories(lambda h: f"{HEALTH_EMOJI[h]} {h}")
+    score = filtered_df['compositeScore']
+    score_emoji = pd.Series(np.select(
+        [score >= 0.8, score >= 0.65, score >= 0.5],
+        ["🟢", "🟡", "🟠"],
+        default="🔴"
+    ), index=score.index)
+    
+    # Build the display table straight from the filtered columns, without an intermediate copy
+    final_df = pd.DataFrame({
+        'sessionId': filtered_df['sessionId'],
+        'strategyName': filtered_df['strategyName'],
+        'instrument': filtered_df['instrument'],
+        'entryType': filtered_df['entryType'],
+        'year': filtered_df['year'],
+        'Health': health,
+        # Formatted columns are cast to object so an empty selection still concatenates as strings
+        'Score': score_emoji + " " + score.map("{:.3f}".format).astype(object),
+        'Profit': "$" + filtered_df['netProfit'].map("{:,.0f}".format).astype(object),
+        'sharpeRatio': filtered_df['sharpeRatio'],
+        'winRate': filtered_df['winRate'],
+        'topFeatures': filtered_df['topFeatures'],
+        'Favorite': np.where(filtered_df['isFavorited'], "⭐", "☆")
+    })
     
     # Display dataframe
     st.dataframe(
@@ -653,6 +809,150 @@ def render_backtest_table(df):
     
     return filtered_df
 
+OPTIMIZATION_PARAMETERS = ['stopLoss', 'takeProfit', 'wickRatio', 'volumeMultiplier', 'rsiLevel']
+
+def data_version(df):
+    """Cheap fingerprint of the loaded frame, so cached analytics follow any data reload"""
+    session_ids = df['sessionId']
+    return (len(df), session_ids.iat[0], session_ids.iat[-1], df['timestamp'].max().isoformat())
+
+# Analytics aggregations are keyed on the data version, instrument focus and metric;
+# the frame itself is left unhashed (leading underscore)
+@st.cache_data
+def _param_analysis(_analysis_df, version, target_instrument, optimization_metric):
+    """Per-parameter performance aggregates for the analytics tab"""
+    param_analysis = {}
+    parameters = OPTIMIZATION_PARAMETERS
+    
+    # One lazy Polars group_by per parameter, executed together over shared column scans
+    value_columns = list(dict.fromkeys([optimization_metric, 'winRate', 'maxDrawdown']))
+    lf = pl.from_pandas(_analysis_df[parameters + value_columns]).lazy()
+    param_plans = [
+        lf.group_by(param)
+        .agg(
+            pl.col(optimization_metric).mean().round(3).alias('avg_performance'),
+            pl.col(optimization_metric).std().round(3).alias('std_performance'),
+            pl.len().alias('count'),
+            pl.col('winRate').mean().round(3).alias('avg_winrate'),
+            pl.col('maxDrawdown').mean().round(3).alias('avg_drawdown')
+        )
+        .filter(pl.col('count') >= 3)  # Filter for statistical significance
+        .sort('avg_performance', descending=True)
+        for param in parameters
+    ]
+    
+    for param, param_perf in zip(parameters, pl.collect_all(param_plans)):
+        param_analysis[param] = param_perf.to_pandas().set_index(param)
+    
+    return param_analysis
+
+@st.cache_data
+def _strategy_instrument_perf(_analysis_df, version, target_instrument, optimization_metric):
+    """Strategy x instrument performance aggregates for the analytics tab"""
+    # Aggregate in Polars and convert back to pandas only at the Plotly/Streamlit boundary
+    perf_columns = list(dict.fromkeys(['strategyName', 'instrument', optimization_metric, 'winRate', 'netProfit', 'maxDrawdown']))
+    pl_df = pl.from_pandas(_analysis_df[perf_columns]).with_columns(
+        pl.col('strategyName').cast(pl.Utf8),
+        pl.col('instrument').cast(pl.Utf8)
+    )
+    strategy_instrument_perf = (
+        pl_df.group_by(['strategyName', 'instrument'])
+        .agg(
+            pl.col(optimization_metric).mean().round(3).alias('avg_score'),
+            pl.col('winRate').mean().round(3).alias('avg_winrate'),
+            pl.col('netProfit').mean().round(3).alias('avg_profit'),
+            pl.col('maxDrawdown').mean().round(3).alias('avg_drawdown'),
+            pl.len().alias('session_count')
+        )
+        .filter(pl.col('session_count') >= 2)
+    )
+    
+    return strategy_instrument_perf
+
+# Analytics figures share the aggregation cache key and are reused without re-serialising
+MAX_MATRIX_CELLS = 2500      # Browser heatmaps degrade sharply beyond a few thousand cells
+MAX_ANNOTATED_CELLS = 400    # Per-cell text labels are only legible on small matrices
+MAX_SCATTER_POINTS = 5000
+
+def _bin_matrix_axis(matrix, n_bins, axis):
+    """Average adjacent rows (axis=0) or columns (axis=1) of a matrix into n_bins groups"""
+    labels = matrix.index if axis == 0 else matrix.columns
+    bins = np.arange(len(labels)) * n_bins // len(labels)
+    bin_labels = [
+        f"{labels[members[0]]} … {labels[members[-1]]}" if len(members) > 1 else str(labels[members[0]])
+        for members in (np.flatnonzero(bins == b) for b in range(n_bins))
+    ]
+    binned = (matrix if axis == 0 else matrix.T).groupby(bins).mean()
+    binned.index = bin_labels
+    return binned if axis == 0 else binned.T
+
+@st.cache_resource(max_entries=32)
+def _build_matrix_fig(_strategy_instrument_perf, version, target_instrument, optimization_metric):
+    """Strategy x instrument performance matrix heatmap"""
+    perf_matrix = (
+        _strategy_instrument_perf
+        .pivot(on='instrument', index='strategyName', values='avg_score')
+        .fill_null(0)
+        .sort('strategyName')
+        .to_pandas()
+        .set_index('strategyName')
+    )
+    perf_matrix = perf_matrix[sorted(perf_matrix.columns)]
+    
+    # Cap the cell count server-side so render time stays flat as data grows
+    if perf_matrix.size > MAX_MATRIX_CELLS:
+        side = int(np.sqrt(MAX_MATRIX_CELLS))
+        if perf_matrix.shape[0] > side:
+            perf_matrix = _bin_matrix_axis(perf_matrix, side, axis=0)
+        if perf_matrix.shape[1] > side:
+            perf_matrix = _bin_matrix_axis(perf_matrix, side, axis=1)
+    
+    fig_matrix = px.imshow(
+        perf_matrix,
+        title=f"Strategy Performance Matrix ({optimization_metric})",
+        color_continuous_scale='RdYlGn',
+        text_auto='.3f' if perf_matrix.size <= MAX_ANNOTATED_CELLS else False
+    )
+    fig_matrix.update_layout(height=400)
+    return fig_matrix
+
+@st.cache_resource(max_entries=32)
+def _build_distribution_fig(_analysis_df, version, target_instrument, optimization_metric):
+    """Histogram of the optimization metric with mean and 80th percentile markers"""
+    # Pull the metric column once; the histogram and both markers read the same array
+    metric_values = np.ascontiguousarray(_analysis_df[optimization_metric].to_numpy())
+    
+    fig_dist = px.histogram(x=metric_values, nbins=20,
+                           title=f"{optimization_metric} Distribution",
+                           labels={'x': optimization_metric},
+                           color_discrete_sequence=['lightblue'])
+    fig_dist.add_vline(x=float(metric_values.mean()), 
+                      line_dash="dash", line_color="red",
+                      annotation_text="Mean")
+    fig_dist.add_vline(x=float(np.quantile(metric_values, 0.8)), 
+                      line_dash="dash", line_color="green",
+                      annotation_text="80th Percentile")
+    return fig_dist
+
+@st.cache_resource(max_entries=32)
+def _build_risk_return_fig(_analysis_df, version, target_instrument, optimization_metric):
+    """Drawdown vs optimization metric scatter sized by net profit"""
+    # Stratified sample per instrument so large result sets keep every instrument visible
+    if len(_analysis_df) > MAX_SCATTER_POINTS:
+        _analysis_df = _analysis_df.groupby('instrument', observed=True, group_keys=False).sample(
+            frac=MAX_SCATTER_POINTS / len(_analysis_df), random_state=0
+        )
+    
+    # Create positive size values for scatter plot
+    net_profit = _analysis_df['netProfit'].to_numpy()
+    size_values = net_profit - net_profit.min() + 100.0  # Shift to positive and add offset
+    
+    return px.scatter(_analysis_df, x='maxDrawdown', y=optimization_metric,
+                     color='instrument', size=size_values,
+                     title="Risk vs Return Analysis",
+                     hover_data=['strategyName', 'winRate', 'netProfit'],
+                     render_mode='webgl')
+
 def render_performance_analytics(df):
     """Render performance analytics focused on optimal parameter identification"""
     st.subheader("🎯 Optimal Parameter Identification")
@@ -661,7 +961,7 @@ def render_performance_analytics(df):
     col1, col2 = st.columns(2)
     with col1:
         target_instrument = st.selectbox("Focus Instrument", 
-                                       ["All"] + sorted(df['instrument'].unique().tolist()),
+                                       ["All"] + st.session_state.filter_options['instrument'],
                                        key="analytics_instrument")
     with col2:
         optimization_metric = st.selectbox("Optimization Target", 
@@ -678,21 +978,10 @@ def render_performance_analytics(df):
     # Optimal conditions analysis
     st.subheader("🌟 Optimal Conditions Analysis")
     
-    # Create parameter ranges analysis
-    param_analysis = {}
-    parameters = ['stopLoss', 'takeProfit', 'wickRatio', 'volumeMultiplier', 'rsiLevel']
-    
-    for param in parameters:
-        # Group by parameter value and calculate average performance
-        param_perf = analysis_df.groupby(param).agg({
-            optimization_metric: ['mean', 'std', 'count'],
-            'winRate': 'mean',
-            'maxDrawdown': 'mean'
-        }).round(3)
-        
-        param_perf.columns = ['avg_performance', 'std_performance', 'count', 'avg_winrate', 'avg_drawdown']
-        param_perf = param_perf[param_perf['count'] >= 3]  # Filter for statistical significance
-        param_analysis[param] = param_perf.sort_values('avg_performance', ascending=False)
+    # Create parameter ranges analysis (cached per data version, instrument focus and metric)
+    version = data_version(df)
+    parameters = OPTIMIZATION_PARAMETERS
+    param_analysis = _param_analysis(analysis_df, version, target_instrument, optimization_metric)
     
     # Display optimal ranges for each parameter
     opt_col1, opt_col2, opt_col3 = st.columns(3)
@@ -751,87 +1040,62 @@ def render_performance_analytics(df):
                 gradients = np.diff(values)
                 smoothness = 1.0 / (1.0 + np.std(gradients))
                 
-                # Find clusters of similar performance
+                # Find clusters of similar performance: runs between threshold breaks
                 cluster_threshold = np.std(values) * 0.5
-                clusters = []
-                current_cluster = [0]
-                
-                for i in range(1, len(values)):
-                    if abs(values[i] - values[i-1]) <= cluster_threshold:
-                        current_cluster.append(i)
-                    else:
-                        if len(current_cluster) > 1:
-                            clusters.append(current_cluster)
-                        current_cluster = [i]
-                
-                if len(current_cluster) > 1:
-                    clusters.append(current_cluster)
+                breaks = np.abs(np.diff(values)) > cluster_threshold
+                boundaries = np.r_[0, np.flatnonzero(breaks) + 1, len(values)]
+                num_clusters = int(np.count_nonzero(np.diff(boundaries) > 1))
                 
                 clustering_results.append({
                     'Parameter': param,
                     'Smoothness': smoothness,
-                    'Clusters': len(clusters),
+                    'Clusters': num_clusters,
                     'Best_Range': f"{param_data[param].iloc[0]} - {param_data[param].iloc[min(2, len(param_data)-1)]}",
                     'Performance_Std': np.std(values)
                 })
     
     if clustering_results:
-        cluster_df = pd.DataFrame(clustering_results).sort_values('Smoothness', ascending=False)
+        cluster_sorted = sorted(clustering_results, key=lambda r: r['Smoothness'], reverse=True)
         
         cluster_col1, cluster_col2 = st.columns(2)
         
         with cluster_col1:
             st.write("**Parameter Gradient Quality:**")
-            for _, row in cluster_df.iterrows():
+            for row in cluster_sorted:
                 quality = "🟢 Smooth" if row['Smoothness'] > 0.7 else "🟡 Moderate" if row['Smoothness'] > 0.4 else "🔴 Rough"
                 st.write(f"• **{row['Parameter']}**: {quality} ({row['Smoothness']:.2f})")
         
         with cluster_col2:
             st.write("**Recommended Ranges (Low Overfitting):**")
-            for _, row in cluster_df.head(3).iterrows():
+            for row in cluster_sorted[:3]:
                 st.write(f"• **{row['Parameter']}**: {row['Best_Range']}")
                 st.write(f"  └ {row['Clusters']} smooth clusters found")
     
     # Strategy comparison across instruments
     st.subheader("🏆 Strategy Performance by Instrument")
     
-    strategy_instrument_perf = analysis_df.groupby(['strategyName', 'instrument']).agg({
-        optimization_metric: 'mean',
-        'winRate': 'mean',
-        'netProfit': 'mean',
-        'maxDrawdown': 'mean',
-        'sessionId': 'count'
-    }).round(3)
-    strategy_instrument_perf.columns = ['avg_score', 'avg_winrate', 'avg_profit', 'avg_drawdown', 'session_count']
-    strategy_instrument_perf = strategy_instrument_perf[strategy_instrument_perf['session_count'] >= 2]
+    strategy_instrument_perf = _strategy_instrument_perf(analysis_df, version, target_instrument, optimization_metric)
     
     # Create strategy-instrument performance matrix
-    if len(strategy_instrument_perf) > 0:
-        perf_matrix = strategy_instrument_perf.pivot_table(
-            index='strategyName', 
-            columns='instrument', 
-            values='avg_score',
-            fill_value=0
-        )
-        
-        fig_matrix = px.imshow(
-            perf_matrix,
-            title=f"Strategy Performance Matrix ({optimization_metric})",
-            color_continuous_scale='RdYlGn',
-            text_auto='.3f'
-        )
-        fig_matrix.update_layout(height=400)
+    if strategy_instrument_perf.height > 0:
+        fig_matrix = _build_matrix_fig(strategy_instrument_perf, version, target_instrument, optimization_metric)
         st.plotly_chart(fig_matrix, use_container_width=True)
         
         # Best combinations table
         st.subheader("🥇 Top Strategy-Instrument Combinations")
-        top_combinations = strategy_instrument_perf.nlargest(10, 'avg_score')
-        
-        display_combinations = top_combinations.reset_index()
-        display_combinations['Strategy-Instrument'] = display_combinations['strategyName'] + ' + ' + display_combinations['instrument']
-        
-        combo_display = display_combinations[['Strategy-Instrument', 'avg_score', 'avg_winrate', 'avg_profit', 'session_count']]
-        combo_display.columns = ['Combination', 'Avg Score', 'Win Rate', 'Avg Profit', 'Sessions']
+        combo_display = (
+            strategy_instrument_perf
+            .sort('avg_score', descending=True)
+            .head(10)
+            .select(
+                pl.concat_str([pl.col('strategyName'), pl.col('instrument')], separator=' + ').alias('Combination'),
+                pl.col('avg_score').alias('Avg Score'),
+                pl.col('avg_winrate').alias('Win Rate'),
+                pl.col('avg_profit').alias('Avg Profit'),
+                pl.col('session_count').alias('Sessions')
+            )
+            .to_pandas()
+        )
         
         st.dataframe(combo_display, use_container_width=True, hide_index=True)
     
@@ -842,32 +1106,22 @@ def render_performance_analytics(df):
     
     with dist_col1:
         # Performance distribution
-        fig_dist = px.histogram(analysis_df, x=optimization_metric, nbins=20,
-                               title=f"{optimization_metric} Distribution",
-                               color_discrete_sequence=['lightblue'])
-        fig_dist.add_vline(x=analysis_df[optimization_metric].mean(), 
-                          line_dash="dash", line_color="red",
-                          annotation_text="Mean")
-        fig_dist.add_vline(x=analysis_df[optimization_metric].quantile(0.8), 
-                          line_dash="dash", line_color="green",
-                          annotation_text="80th Percentile")
+        fig_dist = _build_distribution_fig(analysis_df, version, target_instrument, optimization_metric)
         st.plotly_chart(fig_dist, use_container_width=True)
     
     with dist_col2:
         # Risk-Return scatter
-        # Create positive size values for scatter plot
-        analysis_df_copy = analysis_df.copy()
-        min_profit = analysis_df_copy['netProfit'].min()
-        analysis_df_copy['size_values'] = analysis_df_copy['netProfit'] - min_profit + 100  # Shift to positive and add offset
-        
-        fig_scatter = px.scatter(analysis_df_copy, x='maxDrawdown', y=optimization_metric,
-                               color='instrument', size='size_values',
-                               title="Risk vs Return Analysis",
-                               hover_data=['strategyName', 'winRate', 'netProfit'])
+        fig_scatter = _build_risk_return_fig(analysis_df, version, target_instrument, optimization_metric)
         st.plotly_chart(fig_scatter, use_container_width=True)
 
 # Removed old render_session_details function as it's no longer used
 
+@st.cache_data
+def _csv_bytes(df):
+    """Serialise the backtest frame to CSV once per distinct frame"""
+    export_columns = [col for col in df.columns if not col.startswith('_')]
+    return df[export_columns].to_csv(index=False).encode()
+
 # Main Application
 def main():
     # Sidebar
@@ -876,16 +1130,25 @@ def main():
     st.sidebar.markdown("---")
     
     # Load mock data
-    df = generate_mock_backtest_data()
+    df = load_backtest_data()
+    
+    # Compute filter option lists once per data load instead of on every rerun
+    if 'filter_options' not in st.session_state:
+        # Categorical columns already carry their sorted category list, no unique()/sorted() needed
+        st.session_state.filter_options = {
+            col: df[col].cat.categories.tolist()
+            for col in ['strategyName', 'instrument', 'entryType']
+        }
+        st.session_state.filter_options['year'] = np.unique(df['year'].to_numpy()).tolist()
     
     # Quick stats
     st.sidebar.subheader("📊 Quick Stats")
     st.sidebar.metric("Total Backtests", len(df))
     st.sidebar.metric("Strategies", df['strategyName'].nunique())
-    st.sidebar.metric("Avg Composite Score", f"{df['compositeScore'].mean():.2f}")
+    st.sidebar.metric("Avg Composite Score", f"{df['compositeScore'].to_numpy().mean():.2f}")
     
-    # Best performer
-    best_performer = df.loc[df['compositeScore'].idxmax()]
+    # Best performer (recomputed each run: the cached frame is shared and can be regenerated by any session)
+    best_performer = df.iloc[int(df['compositeScore'].to_numpy().argmax())]
     st.sidebar.success(f"🏆 Best: {best_performer['strategyName']}")
     st.sidebar.text(f"Score: {best_performer['compositeScore']:.3f}")
     st.sidebar.text(f"Profit: ${best_performer['netProfit']:,.0f}")
@@ -896,16 +1159,16 @@ def main():
     st.sidebar.subheader("🔧 Data Management")
     if st.sidebar.button("🔄 Refresh Data"):
         st.cache_data.clear()
+        st.cache_resource.clear()
+        st.session_state.pop('filter_options', None)
         st.rerun()
     
-    if st.sidebar.button("📤 Export CSV"):
-        csv = df.to_csv(index=False)
-        st.sidebar.download_button(
-            label="💾 Download",
-            data=csv,
-            file_name=f"backtest_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
-        )
+    st.sidebar.download_button(
+        label="📤 Export CSV",
+        data=_csv_bytes(df),
+        file_name=f"backtest_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        mime="text/csv"
+    )
     
     # Main content
     st.title("🚀 Backtest Repository Dashboard")
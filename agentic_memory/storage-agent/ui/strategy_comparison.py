@@ -3,7 +3,8 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from datetime import datetime, timedelta
+from numba import njit, prange
+from datetime import timedelta
 import uuid
 
 # Set page configuration
@@ -32,96 +33,78 @@ def generate_strategy_data():
     
     instruments = ["MGC", "ES", "NQ", "GC", "CL"]
     
-    data = []
-    for strategy in strategies:
-        for instrument in instruments:
-            # Generate 5-15 sessions per strategy-instrument combo
-            num_sessions = np.random.randint(5, 16)
-            
-            for i in range(num_sessions):
-                session_id = f"{strategy}_{instrument}_{uuid.uuid4().hex[:8]}"
-                
-                # Strategy-specific performance characteristics
-                if "OrderFlow" in strategy:
-                    base_performance = np.random.normal(0.1, 0.8)  # Slightly positive bias
-                elif "EMA" in strategy:
-                    base_performance = np.random.normal(-0.1, 0.6)  # Slightly negative
-                elif "RSI" in strategy:
-                    base_performance = np.random.normal(0.2, 0.9)  # More variable
-                elif "VWAP" in strategy:
-                    base_performance = np.random.normal(0.05, 0.7)
-                else:
-                    base_performance = np.random.normal(0.0, 0.8)
-                
-                net_profit = base_performance * 2000 + np.random.normal(0, 500)
-                sharpe_ratio = max(0.1, base_performance * 0.5 + 1.2 + np.random.normal(0, 0.3))
-                win_rate = max(0.2, min(0.9, 0.55 + base_performance * 0.1 + np.random.normal(0, 0.05)))
-                profit_factor = max(0.5, 1.0 + base_performance * 0.3 + np.random.normal(0, 0.2))
-                max_drawdown = abs(net_profit * 0.3 + np.random.normal(0, 200))
-                
-                total_trades = np.random.randint(50, 300)
-                
-                data.append({
-                    'sessionId': session_id,
-                    'strategy': strategy,
-                    'instrument': instrument,
-                    'netProfit': round(net_profit, 2),
-                    'sharpeRatio': round(sharpe_ratio, 2),
-                    'winRate': round(win_rate, 3),
-                    'profitFactor': round(profit_factor, 2),
-                    'maxDrawdown': round(max_drawdown, 2),
-                    'totalTrades': total_trades,
-                    'timestamp': datetime.now() - timedelta(days=np.random.randint(1, 365))
-                })
-    
-    return pd.DataFrame(data)
-
-def generate_cumulative_trading_curve(session_data, start_date=None, end_date=None):
-    """Generate accurate cumulative trading representation"""
-    np.random.seed(hash(session_data['sessionId']) % 2**32)
-    
-    num_trades = session_data['totalTrades']
-    starting_capital = 10000
-    win_rate = session_data['winRate']
-    net_profit = session_data['netProfit']
-    max_drawdown = session_data['maxDrawdown']
-    profit_factor = session_data['profitFactor']
-    
-    # Calculate realistic win/loss distribution based on profit factor
-    total_wins = int(num_trades * win_rate)
-    total_losses = num_trades - total_wins
-    
-    if total_wins > 0 and total_losses > 0:
-        # Profit Factor = Gross Profit / Gross Loss
-        # Net Profit = Gross Profit - Gross Loss
-        # Solving: PF = GP/GL and NP = GP - GL
-        gross_loss = (net_profit) / (profit_factor - 1) if profit_factor > 1 else max_drawdown
-        gross_profit = gross_loss * profit_factor
-        
-        avg_win = gross_profit / total_wins
-        avg_loss = -gross_loss / total_losses
-    else:
-        avg_win = 150
-        avg_loss = -100
+    rng = np.random.default_rng()
+    
+    # Generate 5-15 sessions per strategy-instrument combo
+    num_sessions = rng.integers(5, 16, size=(len(strategies), len(instruments))).ravel()
+    total = num_sessions.sum()
+    strategy_codes = np.repeat(np.repeat(np.arange(len(strategies)), len(instruments)), num_sessions)
+    instrument_codes = np.repeat(np.tile(np.arange(len(instruments)), len(strategies)), num_sessions)
+    
+    # Strategy-specific performance characteristics (mean, std of the base performance draw)
+    def performance_profile(strategy):
+        if "OrderFlow" in strategy:
+            return 0.1, 0.8  # Slightly positive bias
+        elif "EMA" in strategy:
+            return -0.1, 0.6  # Slightly negative
+        elif "RSI" in strategy:
+            return 0.2, 0.9  # More variable
+        elif "VWAP" in strategy:
+            return 0.05, 0.7
+        return 0.0, 0.8
+    
+    profiles = np.array([performance_profile(strategy) for strategy in strategies])
+    base_performance = rng.normal(profiles[strategy_codes, 0], profiles[strategy_codes, 1])
+    
+    net_profit = base_performance * 2000 + rng.normal(0, 500, total)
+    sharpe_ratio = np.maximum(0.1, base_performance * 0.5 + 1.2 + rng.normal(0, 0.3, total))
+    win_rate = np.clip(0.55 + base_performance * 0.1 + rng.normal(0, 0.05, total), 0.2, 0.9)
+    profit_factor = np.maximum(0.5, 1.0 + base_performance * 0.3 + rng.normal(0, 0.2, total))
+    max_drawdown = np.abs(net_profit * 0.3 + rng.normal(0, 200, total))
+    
+    # One random batch prefix plus a running counter keeps ids unique without a uuid per row
+    batch_id = uuid.uuid4().hex[:4]
+    session_ids = [
+        f"{strategies[s]}_{instruments[i]}_{batch_id}{n:04x}"
+        for n, (s, i) in enumerate(zip(strategy_codes, instrument_codes))
+    ]
     
-    # Generate trade sequence with realistic market patterns
-    trades_pnl = []
-    equity_peaks = []  # Track equity peaks for drawdown calculation
+    return pd.DataFrame({
+        'sessionId': session_ids,
+        'strategy': pd.Categorical.from_codes(strategy_codes, categories=strategies),
+        'instrument': pd.Categorical.from_codes(instrument_codes, categories=instruments),
+        'netProfit': net_profit.round(2).astype(np.float32),
+        'sharpeRatio': sharpe_ratio.round(2).astype(np.float32),
+        'winRate': win_rate.round(3).astype(np.float32),
+        'profitFactor': profit_factor.round(2).astype(np.float32),
+        'maxDrawdown': max_drawdown.round(2).astype(np.float32),
+        'totalTrades': rng.integers(50, 300, total, dtype=np.int32),
+        'timestamp': pd.Timestamp.now() - pd.to_timedelta(rng.integers(1, 365, total), unit='D'),
+        # Per-session simulation seed (str hash() is randomised per interpreter, so it is not stable)
+        'seed': rng.integers(0, 2**32, total, dtype=np.uint32)
+    })
+
+# Large-loss multipliers after a losing streak, with cumulative probabilities for inverse-CDF draws
+STREAK_LOSS_MULTIPLIERS = np.array([0.8, 1.2, 2.5])
+STREAK_LOSS_CUM_PROBS = np.array([0.7, 0.95, 1.0])
+
+@njit(cache=True)
+def _simulate_trades(num_trades, win_rate, avg_win, avg_loss, seed):
+    """Simulate a trade PnL sequence with market regimes and loss streaks (compiled trade loop)"""
+    np.random.seed(seed)  # Seeds numba's own per-thread generator, not NumPy's global state
+    trades_pnl = np.empty(num_trades)
     consecutive_losses = 0
-    daily_trading_sessions = []
-    
-    # Simulate trading over time periods (not every day)
-    trading_days = np.random.choice(range(num_trades * 2), num_trades, replace=False)
-    trading_days.sort()
+    # Wins/losses among the last 10 trades, kept as a rolling count instead of rescanning the window
+    recent_losses = 0
+    recent_wins = 0
     
     for i in range(num_trades):
         # Market regime effects (trending vs choppy periods)
         regime_factor = 1.0
         if i > 10:  # After some trades, check recent performance
-            recent_trades = trades_pnl[-10:]
-            if len([t for t in recent_trades if t < 0]) > 7:  # Choppy period
+            if recent_losses > 7:  # Choppy period
                 regime_factor = 0.7  # Smaller wins/losses
-            elif len([t for t in recent_trades if t > 0]) > 7:  # Trending period
+            elif recent_wins > 7:  # Trending period
                 regime_factor = 1.3  # Larger moves
         
         # Realistic win/loss generation
@@ -131,181 +114,220 @@ def generate_cumulative_trading_curve(session_data, start_date=None, end_date=No
                 win_size = avg_win * 0.6 * regime_factor
             else:
                 # Log-normal distribution for wins (more small wins, fewer large ones)
-                win_multiplier = np.random.lognormal(mean=0, sigma=0.6)
+                win_multiplier = np.random.lognormal(0.0, 0.6)
                 win_size = avg_win * min(win_multiplier, 3.0) * regime_factor
             
-            trades_pnl.append(abs(win_size))
+            trades_pnl[i] = abs(win_size)
             consecutive_losses = 0
         else:
             # Losing trade
             if consecutive_losses < 2:  # Normal loss
-                loss_multiplier = np.random.gamma(shape=2, scale=0.5)  # Skewed toward smaller losses
+                loss_multiplier = np.random.gamma(2.0, 0.5)  # Skewed toward smaller losses
             else:  # After multiple losses, occasional large loss (stop hunt, gap, etc.)
-                loss_multiplier = np.random.choice([0.8, 1.2, 2.5], p=[0.7, 0.25, 0.05])
+                loss_multiplier = STREAK_LOSS_MULTIPLIERS[
+                    np.searchsorted(STREAK_LOSS_CUM_PROBS, np.random.random(), side='right')
+                ]
             
-            loss_size = avg_loss * loss_multiplier * regime_factor
-            trades_pnl.append(loss_size)
+            trades_pnl[i] = avg_loss * loss_multiplier * regime_factor
             consecutive_losses += 1
+        
+        # Slide the recent-performance window forward by one trade
+        if trades_pnl[i] < 0:
+            recent_losses += 1
+        elif trades_pnl[i] > 0:
+            recent_wins += 1
+        if i >= 10:
+            if trades_pnl[i - 10] < 0:
+                recent_losses -= 1
+            elif trades_pnl[i - 10] > 0:
+                recent_wins -= 1
+    
+    return trades_pnl
+
+@njit(cache=True)
+def _fit_equity_curve(seed, num_trades, win_rate, net_profit, max_drawdown, profit_factor):
+    """Simulate one session's trades and fit them to its net profit and drawdown (full-length equity)"""
+    starting_capital = 10000.0
     
-    # Adjust to hit exact net profit target
-    current_total = sum(trades_pnl)
-    if abs(current_total - net_profit) > 50:  # If significantly off target
-        adjustment_per_trade = (net_profit - current_total) / min(10, num_trades)
-        for i in range(min(10, len(trades_pnl))):
-            trades_pnl[-(i+1)] += adjustment_per_trade
-    
-    # Calculate realistic cumulative equity with proper drawdown tracking
-    cumulative_equity = [starting_capital]
-    running_peak = starting_capital
-    max_observed_dd = 0
+    # Calculate realistic win/loss distribution based on profit factor
+    total_wins = int(num_trades * win_rate)
+    total_losses = num_trades - total_wins
     
-    for pnl in trades_pnl:
-        new_equity = cumulative_equity[-1] + pnl
-        cumulative_equity.append(new_equity)
-        
-        # Track running peak and drawdown
-        if new_equity > running_peak:
-            running_peak = new_equity
-        
-        current_dd = running_peak - new_equity
-        max_observed_dd = max(max_observed_dd, current_dd)
-    
-    # If max drawdown doesn't match, adjust some losing trades
-    if abs(max_observed_dd - max_drawdown) > max_drawdown * 0.3:
-        # Find the biggest drawdown period and adjust
-        peak_equity = starting_capital
-        max_dd_start = 0
-        max_dd_size = 0
-        
-        for i, equity in enumerate(cumulative_equity):
-            if equity > peak_equity:
-                peak_equity = equity
-                max_dd_start = i
-            
-            current_dd = peak_equity - equity
-            if current_dd > max_dd_size:
-                max_dd_size = current_dd
+    if total_wins > 0 and total_losses > 0:
+        # Profit Factor = Gross Profit / Gross Loss
+        # Net Profit = Gross Profit - Gross Loss
+        # Solving: PF = GP/GL and NP = GP - GL
+        gross_loss = (net_profit) / (profit_factor - 1) if profit_factor > 1 else max_drawdown
+        gross_profit = gross_loss * profit_factor
         
-        # Adjust trades in the drawdown period to match target
-        if max_dd_size != max_drawdown and max_dd_start > 0:
-            adjustment_needed = max_drawdown - max_dd_size
-            # Apply adjustment to trades after the peak
-            for i in range(max_dd_start, min(max_dd_start + 5, len(trades_pnl))):
-                if trades_pnl[i] < 0:  # Only adjust losing trades
-                    trades_pnl[i] += adjustment_needed / 5
-    
-    # Recalculate cumulative equity after adjustments
-    cumulative_equity = [starting_capital]
-    for pnl in trades_pnl:
-        new_equity = max(starting_capital * 0.1, cumulative_equity[-1] + pnl)  # Prevent account blow-up
-        cumulative_equity.append(new_equity)
-    
-    # Generate realistic timestamps (not every day has trades)
-    if start_date is None:
-        start_date = session_data['timestamp'] - timedelta(days=60)
-    if end_date is None:
-        end_date = session_data['timestamp']
-    
-    # Create trading dates (skip weekends, some days have no trades)
-    all_dates = pd.date_range(start=start_date, end=end_date, freq='D')
-    business_days = [d for d in all_dates if d.weekday() < 5]  # Remove weekends
-    
-    # Select random subset of business days for trading
-    if len(business_days) >= len(cumulative_equity):
-        trading_dates = sorted(np.random.choice(business_days, len(cumulative_equity), replace=False))
+        avg_win = gross_profit / total_wins
+        avg_loss = -gross_loss / total_losses
     else:
-        # If not enough business days, spread trades across available days
-        trading_dates = business_days + [business_days[-1]] * (len(cumulative_equity) - len(business_days))
-    
-    # Ensure consistent length for averaging
-    target_points = 100
-    if len(cumulative_equity) != target_points:
-        old_indices = np.arange(len(cumulative_equity))
-        new_indices = np.linspace(0, len(cumulative_equity)-1, target_points)
-        cumulative_equity = np.interp(new_indices, old_indices, cumulative_equity)
-        
-        # Resample dates
-        trading_dates = pd.date_range(start=start_date, end=end_date, periods=target_points)
-        
-        # Resample PnL
-        if len(trades_pnl) > 0:
-            pnl_with_zero = [0] + trades_pnl
-            if len(pnl_with_zero) > 1:
-                trades_pnl = np.interp(new_indices, old_indices, pnl_with_zero)[1:]
-            else:
-                trades_pnl = [0] * (target_points - 1)
+        avg_win = 150.0
+        avg_loss = -100.0
     
-    return pd.DataFrame({
-        'Date': trading_dates,
-        'Equity': cumulative_equity,
-        'Trade': range(len(cumulative_equity)),
-        'PnL': [0] + list(trades_pnl[:target_points-1])
-    })
+    # Generate trade sequence with realistic market patterns
+    trades_pnl = _simulate_trades(num_trades, win_rate, avg_win, avg_loss, seed)
+    
+    # If max drawdown doesn't match, scale the losing trades towards the target
+    balance = starting_capital
+    running_peak = starting_capital
+    max_observed_dd = 0.0
+    for i in range(num_trades):
+        balance += trades_pnl[i]
+        running_peak = max(running_peak, balance)
+        max_observed_dd = max(max_observed_dd, running_peak - balance)
+    if max_observed_dd > 0 and abs(max_observed_dd - max_drawdown) > max_drawdown * 0.3:
+        # Bounded so the loss distribution stays recognisable
+        loss_scale = min(max(max_drawdown / max_observed_dd, 0.5), 2.0)
+        for i in range(num_trades):
+            if trades_pnl[i] < 0:
+                trades_pnl[i] *= loss_scale
+    
+    # Adjust to hit exact net profit target with a uniform shift
+    current_total = trades_pnl.sum()
+    if num_trades > 0 and abs(current_total - net_profit) > 50:  # If significantly off target
+        trades_pnl += (net_profit - current_total) / num_trades
+    
+    # Cumulative equity, floored so the account never blows up
+    floor = starting_capital * 0.1
+    cumulative_equity = np.empty(num_trades + 1)
+    cumulative_equity[0] = starting_capital
+    for i in range(num_trades):
+        cumulative_equity[i + 1] = max(floor, cumulative_equity[i] + trades_pnl[i])
+    
+    return cumulative_equity
+
+@njit(cache=True)
+def _sample_indices(length, target_points):
+    """Nearest-lower positions of target_points evenly spaced samples (exact integer arithmetic)"""
+    return np.arange(target_points) * (length - 1) // (target_points - 1)
+
+@njit(parallel=True, cache=True)
+def _equity_curve_batch(seeds, num_trades, win_rates, net_profits, max_drawdowns, profit_factors, target_points):
+    """Fit and resample many sessions' equity curves in parallel into one (sessions, points) array"""
+    n_sessions = seeds.shape[0]
+    curves = np.empty((n_sessions, target_points))
+    
+    for s in prange(n_sessions):
+        equity = _fit_equity_curve(
+            seeds[s], num_trades[s], win_rates[s], net_profits[s], max_drawdowns[s], profit_factors[s]
+        )
+        curves[s] = equity[_sample_indices(equity.shape[0], target_points)]
+    
+    return curves
+
+def equity_curve_batch(sessions_df, target_points=100):
+    """Equity curves for every session in sessions_df, resampled to target_points, as an ndarray"""
+    return _equity_curve_batch(
+        sessions_df['seed'].to_numpy(dtype=np.int64),
+        sessions_df['totalTrades'].to_numpy(dtype=np.int64),
+        sessions_df['winRate'].to_numpy(dtype=np.float64),
+        sessions_df['netProfit'].to_numpy(dtype=np.float64),
+        sessions_df['maxDrawdown'].to_numpy(dtype=np.float64),
+        sessions_df['profitFactor'].to_numpy(dtype=np.float64),
+        target_points
+    )
+
+# Compile (or load the cached build) at import rather than on the first chart render
+_equity_curve_batch(
+    np.zeros(1, dtype=np.int64), np.ones(1, dtype=np.int64), np.full(1, 0.5), np.zeros(1),
+    np.ones(1), np.full(1, 1.5), 100
+)
+
+def compute_outlier_bounds(df, columns=['netProfit', 'maxDrawdown', 'totalTrades'], factor=2.5):
+    """Compute IQR outlier bounds for the columns present in df in one quantile pass"""
+    columns = [column for column in columns if column in df.columns]
+    q1, q3 = df[columns].quantile([0.25, 0.75]).to_numpy()
+    iqr = q3 - q1
+    return columns, q1 - factor * iqr, q3 + factor * iqr
+
+@st.cache_data(max_entries=32)
+def build_outlier_reasons(values, columns, lower_bounds, upper_bounds):
+    """Describe which bounds each outlier row breaks, cached so reruns with the same outliers are free"""
+    # Classify every metric of every row against its bounds in one pass
+    directions = np.select([values < lower_bounds, values > upper_bounds], ['too low', 'too high'], default='')
+    
+    return [
+        '; '.join(
+            f"{col}: {direction} ({value:,.0f})"
+            for col, direction, value in zip(columns, row_directions, row_values)
+            if direction
+        )
+        for row_directions, row_values in zip(directions, values)
+    ]
 
 def detect_outliers(df, columns=['netProfit', 'maxDrawdown', 'totalTrades'], method='iqr', factor=2.5):
     """Detect outliers using IQR method across multiple columns"""
-    outlier_mask = pd.Series([False] * len(df), index=df.index)
-    
-    for column in columns:
-        if column in df.columns:
-            Q1 = df[column].quantile(0.25)
-            Q3 = df[column].quantile(0.75)
-            IQR = Q3 - Q1
-            
-            # Define outlier bounds
-            lower_bound = Q1 - factor * IQR
-            upper_bound = Q3 + factor * IQR
-            
-            # Mark outliers for this column
-            column_outliers = (df[column] < lower_bound) | (df[column] > upper_bound)
-            outlier_mask = outlier_mask | column_outliers
-    
-    return outlier_mask
+    columns, lower_bounds, upper_bounds = compute_outlier_bounds(df, columns, factor)
+    values = df[columns].to_numpy()
+    outlier_mask = ((values < lower_bounds) | (values > upper_bounds)).any(axis=1)
+    return pd.Series(outlier_mask, index=df.index)
 
-def create_strategy_overview(df):
+@st.cache_data
+def _strategy_stats(_df):
+    """Per-strategy session statistics (the mock data only changes on Refresh Data, which clears this cache)"""
+    return _df.groupby('strategy', observed=True, sort=False).agg(
+        profit_std=('netProfit', 'std'),
+        sessions=('netProfit', 'count'),
+        avg_sharpe=('sharpeRatio', 'mean'),
+        avg_winrate=('winRate', 'mean'),
+        avg_pf=('profitFactor', 'mean'),
+        avg_drawdown=('maxDrawdown', 'mean')
+    )
+
+def create_strategy_overview(df, strategy_avg_profit):
     """Create strategy performance overview"""
     st.subheader("📊 Strategy Performance Overview")
     
-    # Calculate strategy statistics
-    strategy_stats = df.groupby('strategy').agg({
-        'netProfit': ['mean', 'std', 'count'],
-        'sharpeRatio': 'mean',
-        'winRate': 'mean',
-        'profitFactor': 'mean',
-        'maxDrawdown': 'mean'
-    }).round(3)
-    
-    # Flatten column names
-    strategy_stats.columns = ['avg_profit', 'profit_std', 'sessions', 'avg_sharpe', 'avg_winrate', 'avg_pf', 'avg_drawdown']
+    # Calculate strategy statistics, reusing the average profit already computed in main()
+    strategy_stats = _strategy_stats(df)
+    strategy_stats.insert(0, 'avg_profit', strategy_avg_profit)
+    strategy_stats = strategy_stats.round(3)
     strategy_stats = strategy_stats.sort_values('avg_profit', ascending=False)
     
     # Display metrics
+    most_consistent = strategy_stats['profit_std'].idxmin()
+    highest_sharpe = strategy_stats['avg_sharpe'].idxmax()
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Best Strategy", strategy_stats.index[0], f"${strategy_stats.iloc[0]['avg_profit']:,.0f} avg")
+        st.metric("Best Strategy", strategy_stats.index[0], f"${strategy_stats['avg_profit'].iat[0]:,.0f} avg")
     with col2:
         st.metric("Most Consistent", 
-                 strategy_stats.nsmallest(1, 'profit_std').index[0],
-                 f"±${strategy_stats.nsmallest(1, 'profit_std').iloc[0]['profit_std']:,.0f}")
+                 most_consistent,
+                 f"±${strategy_stats.at[most_consistent, 'profit_std']:,.0f}")
     with col3:
         st.metric("Highest Sharpe", 
-                 strategy_stats.nlargest(1, 'avg_sharpe').index[0],
-                 f"{strategy_stats.nlargest(1, 'avg_sharpe').iloc[0]['avg_sharpe']:.2f}")
+                 highest_sharpe,
+                 f"{strategy_stats.at[highest_sharpe, 'avg_sharpe']:.2f}")
     with col4:
-        st.metric("Total Sessions", f"{df.shape[0]:,}", f"{len(df['strategy'].unique())} strategies")
+        st.metric("Total Sessions", f"{df.shape[0]:,}", f"{len(df['strategy'].cat.categories)} strategies")
     
     return strategy_stats
 
+@st.cache_data(max_entries=64)
+def _session_equity_matrix(sessions_df, normalize_start, target_points):
+    """Equity curves for every session as one (sessions, points) array, cached per filter selection"""
+    session_curves = equity_curve_batch(sessions_df, target_points)
+    if normalize_start:
+        session_curves = session_curves - session_curves[:, :1] + 10000
+    return session_curves
+
+# Shared tail of every equity-curve hover label
+EQUITY_HOVER_SUFFIX = "<b>Date:</b> %{x}<br><b>Equity:</b> $%{y:,.0f}<extra></extra>"
+
 def create_strategy_equity_overlay(df):
     """Create overlaid equity curves for all strategies"""
     st.subheader("📈 Strategy Equity Curves Comparison")
     
-    # Strategy selection
+    # Strategy selection, with one fixed color per strategy regardless of what is selected
+    strategy_options = sorted(df['strategy'].cat.categories)
+    strategy_colors = dict(zip(strategy_options, px.colors.qualitative.Set1))
     selected_strategies = st.multiselect(
         "Select strategies to compare:",
-        options=sorted(df['strategy'].unique()),
-        default=sorted(df['strategy'].unique())[:4],  # Show first 4 by default
+        options=strategy_options,
+        default=strategy_options[:4],  # Show first 4 by default
         key="strategy_selector"
     )
     
@@ -318,7 +340,7 @@ def create_strategy_equity_overlay(df):
     with col1:
         selected_instrument = st.selectbox(
             "Focus on instrument:",
-            options=["All"] + sorted(df['instrument'].unique()),
+            options=["All"] + sorted(df['instrument'].cat.categories),
             key="instrument_selector"
         )
     with col2:
@@ -344,27 +366,12 @@ def create_strategy_equity_overlay(df):
             # Show outlier details
             with st.expander("View excluded outliers", expanded=False):
                 outlier_sessions = filtered_df[outlier_mask][['sessionId', 'strategy', 'instrument', 'netProfit', 'maxDrawdown', 'totalTrades']]
-                outlier_sessions['Reason'] = ''
                 
-                # Identify why each session is an outlier
-                for idx, row in outlier_sessions.iterrows():
-                    reasons = []
-                    
-                    # Check each metric
-                    for col in ['netProfit', 'maxDrawdown', 'totalTrades']:
-                        if col in filtered_df.columns:
-                            Q1 = filtered_df[col].quantile(0.25)
-                            Q3 = filtered_df[col].quantile(0.75)
-                            IQR = Q3 - Q1
-                            lower_bound = Q1 - 2.5 * IQR
-                            upper_bound = Q3 + 2.5 * IQR
-                            
-                            if row[col] < lower_bound:
-                                reasons.append(f"{col}: too low ({row[col]:,.0f})")
-                            elif row[col] > upper_bound:
-                                reasons.append(f"{col}: too high ({row[col]:,.0f})")
-                    
-                    outlier_sessions.loc[idx, 'Reason'] = '; '.join(reasons)
+                # Identify why each session is an outlier (bounds computed once, not per row)
+                bound_columns, lower_bounds, upper_bounds = compute_outlier_bounds(filtered_df)
+                outlier_sessions['Reason'] = build_outlier_reasons(
+                    outlier_sessions[bound_columns].to_numpy(), tuple(bound_columns), lower_bounds, upper_bounds
+                )
                 
                 st.dataframe(outlier_sessions, use_container_width=True, hide_index=True)
         
@@ -375,80 +382,77 @@ def create_strategy_equity_overlay(df):
         st.warning("No data for selected filters.")
         return
     
-    # Define common timeframe for all curves
-    end_date = datetime.now()
+    # Define common timeframe for all curves (day-aligned so cached curves are reused across reruns)
+    end_date = pd.Timestamp.now().normalize()
     start_date = end_date - timedelta(days=30)
     
-    # Create the overlay chart
-    fig = go.Figure()
-    
-    colors = px.colors.qualitative.Set1[:len(selected_strategies)]
-    
-    for i, strategy in enumerate(selected_strategies):
-        strategy_data = filtered_df[filtered_df['strategy'] == strategy]
+    # Generate every session curve once and share it between the chart and the consolidation analysis
+    target_length = 100  # Fixed number of points for consistency
+    dates = pd.date_range(start=start_date, end=end_date, periods=target_length)
+    # One session's x values plus the trailing gap point, tiled per strategy for the WebGL traces
+    session_x_pattern = dates.append(dates[-1:]).to_numpy()
+    session_curves = _session_equity_matrix(filtered_df, normalize_start, target_length)
+    
+    # Row positions of each strategy and the per-session columns, pulled once for every trace
+    strategy_positions = filtered_df.groupby('strategy', observed=True).indices
+    all_session_ids = filtered_df['sessionId'].to_numpy()
+    all_session_profits = filtered_df['netProfit'].to_numpy()
+    no_rows = np.empty(0, dtype=np.intp)
+    
+    # Collect the overlay traces, then build the figure in one call
+    traces = []
+    
+    for strategy in selected_strategies:
+        rows = strategy_positions.get(strategy, no_rows)
+        session_ids = all_session_ids[rows]
+        session_profits = all_session_profits[rows]
+        color = strategy_colors[strategy]
         
         if show_individual:
-            # Show ALL individual session curves overlapped in same timeframe
-            for j, (_, session) in enumerate(strategy_data.iterrows()):
-                equity_curve = generate_cumulative_trading_curve(session, start_date, end_date)
-                
-                # Normalize if requested
-                if normalize_start:
-                    equity_curve['Equity'] = equity_curve['Equity'] - equity_curve['Equity'].iloc[0] + 10000
-                
-                fig.add_trace(go.Scatter(
-                    x=equity_curve['Date'],
-                    y=equity_curve['Equity'],
-                    mode='lines',
-                    name=f"{strategy} - Session {j+1}",
-                    line=dict(color=colors[i], width=1.5),
-                    opacity=0.4,
-                    showlegend=(j == 0),  # Only show first in legend
-                    legendgroup=strategy,
-                    hovertemplate=f"<b>{strategy}</b><br>" +
-                                 f"Session: {session['sessionId'][:8]}<br>" +
-                                 f"Final P/L: ${session['netProfit']:,.0f}<br>" +
-                                 "<b>Date:</b> %{x}<br>" +
-                                 "<b>Equity:</b> $%{y:,.0f}<extra></extra>"
-                ))
-        
-        # Add average performance line for each strategy
-        avg_curve_data = []
-        target_length = 100  # Fixed number of points for consistency
-        
-        for _, session in strategy_data.iterrows():
-            equity_curve = generate_cumulative_trading_curve(session, start_date, end_date)
-            if normalize_start:
-                equity_curve['Equity'] = equity_curve['Equity'] - equity_curve['Equity'].iloc[0] + 10000
+            # Show ALL individual session curves overlapped in same timeframe, as one WebGL trace
+            # per strategy with a NaN point between sessions to break the line
+            points_per_session = len(session_x_pattern)
+            session_equity = np.full((len(session_ids), points_per_session), np.nan)
+            session_equity[:, :-1] = session_curves[rows]
+            session_hover = np.empty((session_equity.size, 2), dtype=object)
+            session_hover[:, 0] = np.repeat([sid[:8] for sid in session_ids], points_per_session)
+            session_hover[:, 1] = np.repeat(session_profits, points_per_session)
             
-            # Resample to fixed length
-            if len(equity_curve) != target_length:
-                indices = np.linspace(0, len(equity_curve)-1, target_length, dtype=int)
-                resampled_equity = equity_curve['Equity'].iloc[indices].values
-            else:
-                resampled_equity = equity_curve['Equity'].values
-                
-            avg_curve_data.append(resampled_equity)
+            traces.append(go.Scattergl(
+                x=np.tile(session_x_pattern, len(session_ids)),
+                y=session_equity.ravel(),
+                customdata=session_hover,
+                mode='lines',
+                name=f"{strategy} - Sessions",
+                line=dict(color=color, width=1.5),
+                opacity=0.4,
+                legendgroup=strategy,
+                hovertemplate=f"<b>{strategy}</b><br>" +
+                             "Session: %{customdata[0]}<br>" +
+                             "Final P/L: $%{customdata[1]:,.0f}<br>" +
+                             EQUITY_HOVER_SUFFIX
+            ))
         
-        if avg_curve_data:
-            avg_equity = np.mean(np.array(avg_curve_data), axis=0)
-            dates = pd.date_range(start=start_date, end=end_date, periods=target_length)
+        # Add average performance line for each strategy
+        if len(rows) > 0:
+            avg_equity = session_curves[rows].mean(axis=0)
             
-            fig.add_trace(go.Scatter(
+            traces.append(go.Scatter(
                 x=dates,
                 y=avg_equity,
                 mode='lines',
                 name=f"{strategy} - Average",
-                line=dict(color=colors[i], width=3, dash='solid'),
+                line=dict(color=color, width=3, dash='solid'),
                 opacity=1.0,
                 legendgroup=strategy,
                 hovertemplate=f"<b>{strategy} Average</b><br>" +
-                             f"Sessions: {len(strategy_data)}<br>" +
-                             f"Avg P/L: ${strategy_data['netProfit'].mean():,.0f}<br>" +
-                             "<b>Date:</b> %{x}<br>" +
-                             "<b>Equity:</b> $%{y:,.0f}<extra></extra>"
+                             f"Sessions: {len(rows)}<br>" +
+                             f"Avg P/L: ${session_profits.mean():,.0f}<br>" +
+                             EQUITY_HOVER_SUFFIX
             ))
     
+    fig = go.Figure(data=traces)
+    
     # Add reference line at starting capital
     fig.add_hline(y=10000, line_dash="dash", line_color="gray", 
                   annotation_text="Starting Capital", annotation_position="right")
@@ -477,70 +481,40 @@ def create_strategy_equity_overlay(df):
     st.write("**Goal**: Identify equity curves with similar performance patterns (consolidated gradients)")
     
     # Calculate curve distances and consolidation metrics
-    analyze_curve_consolidation(filtered_df, start_date, end_date, normalize_start, selected_strategies)
+    analyze_curve_consolidation(filtered_df, session_curves, selected_strategies)
+
+def _pairwise_distances(points):
+    """Euclidean distance for every unordered pair of rows, in i < j order"""
+    i, j = np.triu_indices(len(points), k=1)
+    return np.sqrt(((points[i] - points[j]) ** 2).sum(axis=1))
 
-def analyze_curve_consolidation(df, start_date, end_date, normalize_start, strategies):
+def analyze_curve_consolidation(df, session_curves, strategies):
     """Analyze consolidation between equity curves using multi-axis evaluation"""
     
-    # Generate all curves for analysis
-    all_curves_data = {}
-    target_points = 100
-    
-    for strategy in strategies:
-        strategy_data = df[df['strategy'] == strategy]
-        curves = []
-        
-        for _, session in strategy_data.iterrows():
-            equity_curve = generate_cumulative_trading_curve(session, start_date, end_date)
-            if normalize_start:
-                equity_curve['Equity'] = equity_curve['Equity'] - equity_curve['Equity'].iloc[0] + 10000
-            
-            curves.append({
-                'equity': equity_curve['Equity'].values,
-                'session_id': session['sessionId'],
-                'final_pnl': session['netProfit'],
-                'sharpe': session['sharpeRatio'],
-                'win_rate': session['winRate']
-            })
-        
-        all_curves_data[strategy] = curves
+    # Per-session columns pulled once; session_curves rows line up with df rows
+    strategy_codes = df['strategy'].cat.codes.to_numpy()
+    strategy_categories = df['strategy'].cat.categories
+    # Combined performance axes, each normalized by its typical range
+    performance_values = df[['netProfit', 'sharpeRatio', 'winRate']].to_numpy(dtype=np.float64) / np.array([2000.0, 2.0, 0.5])
     
     # Multi-axis consolidation analysis
     consolidation_results = []
     
     for strategy in strategies:
-        curves = all_curves_data[strategy]
-        if len(curves) < 2:
+        strategy_rows = strategy_codes == strategy_categories.get_loc(strategy)
+        session_count = int(strategy_rows.sum())
+        if session_count < 2:
             continue
             
         # Calculate pairwise distances between curves
-        distances = []
-        performance_similarities = []
+        curve_matrix = session_curves[strategy_rows]
+        # Euclidean distance between equity curves (RMS over points)
+        distances = _pairwise_distances(curve_matrix) / np.sqrt(curve_matrix.shape[1])
         
-        for i in range(len(curves)):
-            for j in range(i+1, len(curves)):
-                curve1 = curves[i]['equity']
-                curve2 = curves[j]['equity']
-                
-                # Euclidean distance between equity curves
-                curve_distance = np.sqrt(np.mean((curve1 - curve2)**2))
-                
-                # Performance similarity (normalized)
-                pnl_diff = abs(curves[i]['final_pnl'] - curves[j]['final_pnl'])
-                sharpe_diff = abs(curves[i]['sharpe'] - curves[j]['sharpe'])
-                winrate_diff = abs(curves[i]['win_rate'] - curves[j]['win_rate'])
-                
-                # Combined performance distance
-                perf_distance = np.sqrt(
-                    (pnl_diff / 2000)**2 +  # Normalize by typical PnL range
-                    (sharpe_diff / 2)**2 +   # Normalize by typical Sharpe range
-                    (winrate_diff / 0.5)**2  # Normalize by typical win rate range
-                )
-                
-                distances.append(curve_distance)
-                performance_similarities.append(perf_distance)
+        # Combined performance distance
+        performance_similarities = _pairwise_distances(performance_values[strategy_rows])
         
-        if distances:
+        if distances.size:
             # Consolidation metrics
             avg_curve_distance = np.mean(distances)
             std_curve_distance = np.std(distances)
@@ -559,7 +533,7 @@ def analyze_curve_consolidation(df, start_date, end_date, normalize_start, strat
                 'Performance_Consolidation': performance_consolidation,
                 'Overall_Consolidation': overall_consolidation,
                 'Avg_Curve_Distance': avg_curve_distance,
-                'Sessions': len(curves)
+                'Sessions': session_count
             })
     
     if consolidation_results:
@@ -654,11 +628,12 @@ def main():
     # Quick stats
     st.sidebar.subheader("📈 Quick Stats")
     st.sidebar.metric("Total Sessions", len(df))
-    st.sidebar.metric("Strategies", df['strategy'].nunique())
-    st.sidebar.metric("Instruments", df['instrument'].nunique())
+    st.sidebar.metric("Strategies", len(df['strategy'].cat.categories))
+    st.sidebar.metric("Instruments", len(df['instrument'].cat.categories))
     
-    best_strategy = df.groupby('strategy')['netProfit'].mean().idxmax()
-    best_profit = df.groupby('strategy')['netProfit'].mean().max()
+    strategy_avg_profit = df.groupby('strategy', observed=True)['netProfit'].mean()
+    best_strategy = strategy_avg_profit.idxmax()
+    best_profit = strategy_avg_profit.max()
     st.sidebar.success(f"🏆 Best: {best_strategy}")
     st.sidebar.text(f"Avg: ${best_profit:,.0f}")
     
@@ -671,7 +646,7 @@ def main():
         st.rerun()
     
     # Main content
-    create_strategy_overview(df)
+    create_strategy_overview(df, strategy_avg_profit)
     st.markdown("---")
     create_strategy_equity_overlay(df)
     
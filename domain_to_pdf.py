@@ -6,13 +6,18 @@ Crawls all pages from a domain and creates a combined PDF
 
 import scrapy
 from scrapy.crawler import CrawlerProcess
+from scrapy.utils.defer import maybe_deferred_to_future
 from scrapy.utils.project import get_project_settings
+from twisted.internet.defer import DeferredList
+from twisted.internet.threads import deferToThread
 from weasyprint import HTML, CSS
-from PyPDF2 import PdfMerger
+from lxml import html as lxml_html
+import pikepdf
 import requests
 from urllib.parse import urljoin, urlparse
 import os
 import time
+import bisect
 import logging
 from pathlib import Path
 
@@ -20,30 +25,57 @@ from pathlib import Path
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Linked file types that are not pages and should not be crawled
+SKIP_EXTENSIONS = frozenset({'.pdf', '.jpg', '.png', '.gif', '.zip', '.doc', '.xls'})
+
+# Custom CSS for better PDF output
+PDF_STYLESHEET = """
+    @page {
+        margin: 1in;
+        size: A4;
+    }
+    body {
+        font-family: Arial, sans-serif;
+        font-size: 12px;
+        line-height: 1.4;
+    }
+    img {
+        max-width: 100%;
+        height: auto;
+    }
+    .no-print {
+        display: none;
+    }
+    nav, footer, .sidebar {
+        display: none;
+    }
+"""
+
 class ProjectXSpider(scrapy.Spider):
     name = 'projectx_spider'
     allowed_domains = ['projectx.com']
     start_urls = ['https://www.projectx.com/']
     
     def __init__(self):
-        self.visited_urls = set()
         self.pdf_files = []
+        self.page_count = 0
+        # Deferreds for every render started, so closing can wait on any still running
+        self.pdf_renders = []
         self.output_dir = Path('projectx_pdfs')
         self.output_dir.mkdir(exist_ok=True)
+        # Parse the stylesheet once and share it across every page render
+        self.pdf_stylesheet = CSS(string=PDF_STYLESHEET)
         
-    def parse(self, response):
+    async def parse(self, response):
         """Parse each page and extract links"""
         current_url = response.url
         
-        # Skip if already processed
-        if current_url in self.visited_urls:
-            return
-            
-        self.visited_urls.add(current_url)
+        # Already-seen pages never get here: the scheduler's dupe filter drops repeated requests
+        # (including redirects to a page that was already fetched) by request fingerprint
         logger.info(f"Processing: {current_url}")
         
-        # Generate PDF for this page
-        self.generate_page_pdf(response)
+        # Start rendering this page's PDF in a worker thread while its links are followed
+        pdf_rendered = self.generate_page_pdf(response)
         
         # Extract all internal links
         links = response.css('a::attr(href)').getall()
@@ -59,18 +91,22 @@ class ProjectXSpider(scrapy.Spider):
                 parsed_url.netloc.endswith('.projectx.com')):
                 
                 # Skip certain file types and fragments
-                if not any(absolute_url.lower().endswith(ext) for ext in 
-                          ['.pdf', '.jpg', '.png', '.gif', '.zip', '.doc', '.xls']):
-                    if '#' not in absolute_url:  # Skip anchor links
+                if os.path.splitext(parsed_url.path)[1].lower() not in SKIP_EXTENSIONS:
+                    if not parsed_url.fragment:  # Skip anchor links
                         yield scrapy.Request(
                             url=absolute_url,
                             callback=self.parse,
                             dont_filter=False,
                             meta={'depth': response.meta.get('depth', 0) + 1}
                         )
+        
+        # Keep the callback open until the PDF is written, so the spider can't close mid-render
+        # (wrapped as a Future when Scrapy runs on the asyncio reactor)
+        if pdf_rendered is not None:
+            await maybe_deferred_to_future(pdf_rendered)
     
     def generate_page_pdf(self, response):
-        """Generate PDF from page content"""
+        """Generate PDF from page content, returning a Deferred that fires once it is written"""
         try:
             # Clean URL for filename
             url_path = urlparse(response.url).path
@@ -80,46 +116,41 @@ class ProjectXSpider(scrapy.Spider):
             
             # Remove invalid characters
             filename = "".join(c for c in filename if c.isalnum() or c in ('-', '_', '.'))
-            pdf_path = self.output_dir / f"{filename}_{len(self.pdf_files):03d}.pdf"
+            # Numbered when scheduled, since renders can finish out of order
+            pdf_path = self.output_dir / f"{filename}_{self.page_count:03d}.pdf"
+            self.page_count += 1
             
             # Get clean HTML content
-            html_content = self.clean_html(response.text, response.url)
-            
-            # Generate PDF with WeasyPrint
-            html_doc = HTML(string=html_content, base_url=response.url)
-            
-            # Custom CSS for better PDF output
-            css_style = CSS(string="""
-                @page {
-                    margin: 1in;
-                    size: A4;
-                }
-                body {
-                    font-family: Arial, sans-serif;
-                    font-size: 12px;
-                    line-height: 1.4;
-                }
-                img {
-                    max-width: 100%;
-                    height: auto;
-                }
-                .no-print {
-                    display: none;
-                }
-                nav, footer, .sidebar {
-                    display: none;
-                }
-            """)
-            
-            html_doc.write_pdf(str(pdf_path), stylesheets=[css_style])
-            self.pdf_files.append(str(pdf_path))
-            
-            logger.info(f"Generated PDF: {pdf_path}")
+            html_content = self.clean_html(response.body, response.encoding, response.url)
             
         except Exception as e:
             logger.error(f"Failed to generate PDF for {response.url}: {e}")
+            return None
+        
+        # WeasyPrint is CPU-bound, so render off the reactor thread and record the file back on it
+        rendering = deferToThread(self.render_pdf, html_content, response.url, pdf_path)
+        rendering.addCallback(self.record_pdf)
+        self.pdf_renders.append(rendering)
+        return rendering
+    
+    def render_pdf(self, html_content, base_url, pdf_path):
+        """Render one page to PDF with WeasyPrint (runs in a reactor worker thread)"""
+        try:
+            html_doc = HTML(string=html_content, base_url=base_url)
+            html_doc.write_pdf(str(pdf_path), stylesheets=[self.pdf_stylesheet])
+        except Exception as e:
+            logger.error(f"Failed to generate PDF for {base_url}: {e}")
+            return None
+        
+        logger.info(f"Generated PDF: {pdf_path}")
+        return str(pdf_path)
+    
+    def record_pdf(self, pdf_path):
+        """Track a finished PDF for the final merge"""
+        if pdf_path is not None:
+            bisect.insort(self.pdf_files, pdf_path)  # Kept sorted for the merge order
     
-    def clean_html(self, html_content, base_url):
+    def clean_html(self, html_bytes, encoding, base_url):
         """Clean HTML content for better PDF output"""
         # Add page header with URL
         header = f"""
@@ -130,18 +161,28 @@ class ProjectXSpider(scrapy.Spider):
         </div>
         """
         
-        # Insert header after body tag
-        if '<body' in html_content:
-            body_start = html_content.find('>', html_content.find('<body'))
-            if body_start != -1:
-                html_content = (html_content[:body_start+1] + 
-                              header + 
-                              html_content[body_start+1:])
+        # Insert header as the first element of the body (parsed once by lxml, no string scanning).
+        # The raw bytes are parsed with the response encoding, since lxml rejects decoded
+        # strings that still carry an <?xml encoding=...?> declaration
+        parser = lxml_html.HTMLParser(encoding=encoding)
+        document = lxml_html.document_fromstring(html_bytes, parser=parser)
+        body = document.find('body')
+        if body is not None:
+            header_element = lxml_html.fragment_fromstring(header.strip())
+            # Text ahead of the body's first child belongs after the header
+            header_element.tail, body.text = body.text, None
+            body.insert(0, header_element)
         
-        return html_content
+        return lxml_html.tostring(document, encoding='unicode',
+                                  doctype=document.getroottree().docinfo.doctype)
     
     def closed(self, reason):
-        """Called when spider finishes - combine all PDFs"""
+        """Called when spider finishes - wait for in-flight renders, then combine all PDFs"""
+        # Scrapy waits on the returned Deferred before shutting down
+        return DeferredList(self.pdf_renders).addCallback(self.finish_crawl)
+    
+    def finish_crawl(self, _):
+        """Combine all PDFs once every render is recorded"""
         logger.info(f"Spider finished. Combining {len(self.pdf_files)} PDFs...")
         
         if self.pdf_files:
@@ -152,23 +193,27 @@ class ProjectXSpider(scrapy.Spider):
     def combine_pdfs(self):
         """Combine all generated PDFs into one file"""
         try:
-            merger = PdfMerger()
-            
-            # Sort PDF files to maintain some order
-            sorted_pdfs = sorted(self.pdf_files)
+            # QPDF copies page objects by reference, without re-encoding their content streams
+            combined = pikepdf.Pdf.new()
+            sources = []
             
-            for pdf_file in sorted_pdfs:
+            # PDF files are kept sorted as they are recorded, to maintain some order
+            for pdf_file in self.pdf_files:
                 if os.path.exists(pdf_file):
                     logger.info(f"Adding to combined PDF: {pdf_file}")
-                    merger.append(pdf_file)
+                    source = pikepdf.open(pdf_file)
+                    sources.append(source)
+                    combined.pages.extend(source.pages)
             
-            # Output combined PDF
+            # Output combined PDF (sources stay open until the pages have been written)
             output_path = 'projectx_complete.pdf'
-            merger.write(output_path)
-            merger.close()
+            combined.save(output_path, linearize=True)
+            combined.close()
+            for source in sources:
+                source.close()
             
             logger.info(f"✅ Combined PDF created: {output_path}")
-            logger.info(f"📄 Total pages combined: {len(sorted_pdfs)}")
+            logger.info(f"📄 Total pages combined: {len(self.pdf_files)}")
             
             # Optionally clean up individual PDFs
             cleanup = input("Delete individual PDF files? (y/N): ").lower().strip()
@@ -192,9 +237,9 @@ def main():
     settings.setdict({
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'ROBOTSTXT_OBEY': True,  # Respect robots.txt
-        'DOWNLOAD_DELAY': 1,     # Be polite - 1 second between requests
-        'RANDOMIZE_DOWNLOAD_DELAY': True,
-        'CONCURRENT_REQUESTS': 1,  # One request at a time
+        'AUTOTHROTTLE_ENABLED': True,  # Be polite - back off based on server latency
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 2.0,
+        'CONCURRENT_REQUESTS': 4,  # Fetch while earlier pages render
         'DEPTH_LIMIT': 3,        # Limit crawl depth
         'CLOSESPIDER_PAGECOUNT': 50,  # Limit total pages (adjust as needed)
         'LOG_LEVEL': 'INFO',
@@ -6,34 +6,104 @@ Uses pdfkit (wkhtmltopdf) instead of WeasyPrint for Windows compatibility
 
 import scrapy
 from scrapy.crawler import CrawlerProcess
+from scrapy.linkextractors import LinkExtractor
+from scrapy.utils.defer import maybe_deferred_to_future
 from scrapy.utils.project import get_project_settings
 import pdfkit
-from PyPDF2 import PdfMerger
+from pypdf import PdfWriter
 import requests
-from urllib.parse import urljoin, urlparse
+import io
 import os
+import re
+import shutil
+import subprocess
 import time
 import logging
 from pathlib import Path
+from functools import cached_property
+from types import MappingProxyType
 import tempfile
+from twisted.internet.defer import DeferredList, DeferredSemaphore
+from twisted.internet.threads import deferToThread
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# CSS for better PDF output
+PDF_CSS = """
+        <style>
+            body { 
+                font-family: Arial, sans-serif; 
+                font-size: 12px; 
+                line-height: 1.4; 
+                margin: 0; 
+                padding: 20px;
+            }
+            img { 
+                max-width: 100%; 
+                height: auto; 
+            }
+            .no-print, nav, footer, .sidebar, .advertisement { 
+                display: none !important; 
+            }
+            h1, h2, h3 { 
+                color: #333; 
+                margin-top: 20px; 
+            }
+            a { 
+                color: #0066cc; 
+            }
+            pre, code { 
+                background: #f5f5f5; 
+                padding: 5px; 
+                border-radius: 3px; 
+            }
+        </style>
+"""
+
 class ProjectXSpider(scrapy.Spider):
     name = 'projectx_spider'
-    allowed_domains = ['projectx.com']
+    allowed_domains = frozenset({'projectx.com'})
     start_urls = ['https://www.projectx.com/']
     
+    HEAD_END_RE = re.compile(r'</head>', re.IGNORECASE)
+    BODY_START_RE = re.compile(r'<body[^>]*>', re.IGNORECASE)
+    
+    # Pages handed to each wkhtmltopdf process; its startup cost is paid once per batch
+    PAGES_PER_CONVERSION = 8
+    
+    # Internal links, with non-page file types dropped, deduplicated per page and fragments stripped
+    LINK_EXTRACTOR = LinkExtractor(
+        allow_domains=allowed_domains,
+        deny_extensions=['pdf', 'jpg', 'jpeg', 'png', 'gif', 'webp', 'zip', 'doc', 'xls'],
+        unique=True,
+        canonicalize=True,
+    )
+    
     def __init__(self):
-        self.visited_urls = set()
-        self.pdf_files = []
-        self.output_dir = Path('projectx_pdfs')
-        self.output_dir.mkdir(exist_ok=True)
+        # Rendered PDFs are kept in memory, keyed by crawl order; CLOSESPIDER_PAGECOUNT bounds their size
+        self.pdf_blobs = {}
+        self.page_count = 0
+        # (page index, html, url) for fetched pages waiting to fill a conversion batch
+        self.pending_pages = []
+        # Deferreds for every batch started, so closing can wait on any still converting
+        self.pdf_batches = []
+        # Caps simultaneous wkhtmltopdf processes, however many batches are ready at once
+        self.pdf_semaphore = DeferredSemaphore(4)
+        
+        # Page header split around the URL; every page of a crawl is stamped with its start time
+        self.header_prefix = """
+        <div style="border-bottom: 2px solid #ccc; margin-bottom: 20px; padding-bottom: 10px;">
+            <h1 style="margin: 0; font-size: 18px; color: #333;">ProjectX.com</h1>
+            <p style="margin: 5px 0; font-size: 12px; color: #666;">"""
+        self.header_suffix = f"""</p>
+            <p style="margin: 0; font-size: 10px; color: #999;">Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}</p>
+        </div>
+        """
         
-        # Configure wkhtmltopdf options
-        self.pdf_options = {
+        # Configure wkhtmltopdf options, read-only since every batch shares them
+        self.pdf_options = MappingProxyType({
             'page-size': 'A4',
             'margin-top': '0.75in',
             'margin-right': '0.75in',
@@ -42,139 +112,161 @@ class ProjectXSpider(scrapy.Spider):
             'encoding': "UTF-8",
             'no-outline': None,
             'enable-local-file-access': None
-        }
+        })
+        # The same options as wkhtmltopdf command-line flags; None marks a flag without a value
+        self.pdf_args = tuple(
+            arg
+            for name, value in self.pdf_options.items()
+            for arg in ((f'--{name}',) if value is None else (f'--{name}', value))
+        )
         
-    def parse(self, response):
+    async def parse(self, response):
         """Parse each page and extract links"""
         current_url = response.url
         
-        # Skip if already processed
-        if current_url in self.visited_urls:
-            return
-            
-        self.visited_urls.add(current_url)
+        # Already-seen pages never get here: the scheduler's dupe filter drops repeated requests
+        # (including redirects to a page that was already fetched) by request fingerprint
         logger.info(f"Processing: {current_url}")
         
-        # Generate PDF for this page
-        self.generate_page_pdf(response)
+        # Queue this page's PDF; a full batch starts converting in a worker thread while links are followed
+        pdf_rendered = self.generate_page_pdf(response)
         
-        # Extract all internal links
-        links = response.css('a::attr(href)').getall()
+        # Extract all internal links; links seen on earlier pages are dropped by the dupe filter
+        for link in self.LINK_EXTRACTOR.extract_links(response):
+            yield scrapy.Request(
+                url=link.url,
+                callback=self.parse,
+                dont_filter=False,
+                meta={'depth': response.meta.get('depth', 0) + 1}
+            )
         
-        for link in links:
-            # Convert relative URLs to absolute
-            absolute_url = urljoin(current_url, link)
-            parsed_url = urlparse(absolute_url)
-            
-            # Only follow links within the same domain
-            if (parsed_url.netloc in self.allowed_domains or 
-                parsed_url.netloc == '' or 
-                parsed_url.netloc.endswith('.projectx.com')):
-                
-                # Skip certain file types and fragments
-                if not any(absolute_url.lower().endswith(ext) for ext in 
-                          ['.pdf', '.jpg', '.png', '.gif', '.zip', '.doc', '.xls']):
-                    if '#' not in absolute_url:  # Skip anchor links
-                        yield scrapy.Request(
-                            url=absolute_url,
-                            callback=self.parse,
-                            dont_filter=False,
-                            meta={'depth': response.meta.get('depth', 0) + 1}
-                        )
+        # Keep the callback open until the batch is rendered, so the spider can't close mid-conversion
+        # (wrapped as a Future when Scrapy runs on the asyncio reactor)
+        if pdf_rendered is not None:
+            await maybe_deferred_to_future(pdf_rendered)
     
     def generate_page_pdf(self, response):
-        """Generate PDF from page content using pdfkit"""
+        """Queue a page for conversion, returning a Deferred when this page completes a batch"""
+        # Numbered when queued, since batches can finish out of order
+        self.pending_pages.append((self.page_count, response.text, response.url))
+        self.page_count += 1
+        
+        if len(self.pending_pages) >= self.PAGES_PER_CONVERSION:
+            return self.flush_pages()
+        return None
+    
+    def flush_pages(self):
+        """Convert the queued pages, returning a Deferred that fires once they are recorded"""
+        batch, self.pending_pages = self.pending_pages, []
+        if not batch:
+            return None
+        
+        # wkhtmltopdf blocks for seconds per batch, so run it off the reactor thread
+        # and record the results back on it
+        rendering = self.pdf_semaphore.run(deferToThread, self.render_batch, batch)
+        rendering.addCallback(self.record_pdfs)
+        self.pdf_batches.append(rendering)
+        return rendering
+    
+    @cached_property
+    def wkhtmltopdf_path(self):
+        """wkhtmltopdf executable as pdfkit resolves it, looked up once per crawl"""
+        wkhtmltopdf = pdfkit.configuration().wkhtmltopdf
+        if isinstance(wkhtmltopdf, bytes):
+            wkhtmltopdf = wkhtmltopdf.decode()
+        return wkhtmltopdf
+    
+    def render_batch(self, batch):
+        """Render a batch of pages with one wkhtmltopdf process (runs in a reactor worker thread)"""
         try:
-            # Clean URL for filename
-            url_path = urlparse(response.url).path
-            filename = url_path.replace('/', '_').replace('\\', '_')
-            if not filename or filename == '_':
-                filename = 'index'
+            wkhtmltopdf = self.wkhtmltopdf_path
             
-            # Remove invalid characters
-            filename = "".join(c for c in filename if c.isalnum() or c in ('-', '_', '.'))
-            pdf_path = self.output_dir / f"{filename}_{len(self.pdf_files):03d}.pdf"
-            
-            # Create enhanced HTML with header and styling
-            enhanced_html = self.create_enhanced_html(response.text, response.url)
-            
-            # Generate PDF using pdfkit
-            try:
-                pdfkit.from_string(enhanced_html, str(pdf_path), options=self.pdf_options)
-                self.pdf_files.append(str(pdf_path))
-                logger.info(f"Generated PDF: {pdf_path}")
-            except OSError as e:
-                if 'wkhtmltopdf' in str(e):
-                    logger.error("wkhtmltopdf not found! Please install it first.")
-                    logger.info("Download from: https://wkhtmltopdf.org/downloads.html")
-                    return
-                raise e
+            with tempfile.TemporaryDirectory() as temp_dir:
+                # Create enhanced HTML with header and styling, one file per page
+                pages = []
+                for page_index, html_content, url in batch:
+                    html_path = Path(temp_dir) / f"page_{page_index:04d}.html"
+                    # Pieces are encoded straight into the file, never joined into one page string
+                    with open(html_path, 'wb') as html_file:
+                        html_file.writelines(
+                            part.encode('utf-8') for part in self.create_enhanced_html(html_content, url)
+                        )
+                    pages.append((page_index, url, html_path, html_path.with_suffix('.pdf')))
                 
+                # With --read-args-from-stdin each line is one conversion on top of the shared
+                # options, so Qt/WebKit start up once per batch instead of once per page
+                conversions = ''.join(
+                    f'"{html_path.as_posix()}" "{pdf_path.as_posix()}"\n'
+                    for _, _, html_path, pdf_path in pages
+                )
+                subprocess.run(
+                    [wkhtmltopdf, *self.pdf_args, '--quiet', '--read-args-from-stdin'],
+                    input=conversions, capture_output=True, text=True,
+                )
+                
+                rendered = []
+                for page_index, url, _, pdf_path in pages:
+                    if pdf_path.exists():
+                        rendered.append((page_index, pdf_path.read_bytes()))
+                    else:
+                        logger.error(f"Failed to generate PDF for {url}")
+                return rendered
+            
+        except OSError as e:
+            if 'wkhtmltopdf' in str(e):
+                logger.error("wkhtmltopdf not found! Please install it first.")
+                logger.info("Download from: https://wkhtmltopdf.org/downloads.html")
+            else:
+                logger.error(f"Failed to generate PDFs for {len(batch)} pages: {e}")
         except Exception as e:
-            logger.error(f"Failed to generate PDF for {response.url}: {e}")
+            logger.error(f"Failed to generate PDFs for {len(batch)} pages: {e}")
+        return []
+    
+    def record_pdfs(self, rendered):
+        """Keep rendered pages, keyed by crawl order"""
+        for page_index, pdf_blob in rendered:
+            self.pdf_blobs[page_index] = pdf_blob
+            logger.info(f"Generated PDF: page {page_index}")
     
     def create_enhanced_html(self, html_content, url):
-        """Create enhanced HTML with header and styling"""
-        header = f"""
-        <div style="border-bottom: 2px solid #ccc; margin-bottom: 20px; padding-bottom: 10px;">
-            <h1 style="margin: 0; font-size: 18px; color: #333;">ProjectX.com</h1>
-            <p style="margin: 5px 0; font-size: 12px; color: #666;">{url}</p>
-            <p style="margin: 0; font-size: 10px; color: #999;">Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}</p>
-        </div>
-        """
+        """Create enhanced HTML with header and styling, as string pieces in page order"""
+        header = self.header_prefix + url + self.header_suffix
         
-        # CSS for better PDF output
-        css = """
-        <style>
-            body { 
-                font-family: Arial, sans-serif; 
-                font-size: 12px; 
-                line-height: 1.4; 
-                margin: 0; 
-                padding: 20px;
-            }
-            img { 
-                max-width: 100%; 
-                height: auto; 
-            }
-            .no-print, nav, footer, .sidebar, .advertisement { 
-                display: none !important; 
-            }
-            h1, h2, h3 { 
-                color: #333; 
-                margin-top: 20px; 
-            }
-            a { 
-                color: #0066cc; 
-            }
-            pre, code { 
-                background: #f5f5f5; 
-                padding: 5px; 
-                border-radius: 3px; 
-            }
-        </style>
-        """
+        head_end = self.HEAD_END_RE.search(html_content)
+        body_start = self.BODY_START_RE.search(html_content)
+        
+        # Fast path for bare fragments: nothing to splice into, so lead with the styling and header
+        if head_end is None and body_start is None:
+            return [PDF_CSS, header, html_content]
         
-        # Insert CSS and header
-        if '<head>' in html_content:
-            head_end = html_content.find('</head>')
-            if head_end != -1:
-                html_content = html_content[:head_end] + css + html_content[head_end:]
+        # Inject CSS before </head> and the header right after <body ...>
+        insertions = []
+        if head_end is not None:
+            insertions.append((head_end.start(), PDF_CSS))
+        if body_start is not None:
+            insertions.append((body_start.end(), header))
         
-        if '<body' in html_content:
-            body_start = html_content.find('>', html_content.find('<body'))
-            if body_start != -1:
-                html_content = (html_content[:body_start+1] + 
-                              header + 
-                              html_content[body_start+1:])
+        parts = []
+        position = 0
+        for index, text in sorted(insertions):
+            parts += (html_content[position:index], text)
+            position = index
+        parts.append(html_content[position:])
         
-        return html_content
+        return parts
     
     def closed(self, reason):
-        """Called when spider finishes - combine all PDFs"""
-        logger.info(f"Spider finished. Combining {len(self.pdf_files)} PDFs...")
+        """Called when spider finishes - convert the last partial batch, then combine all PDFs"""
+        self.flush_pages()
         
-        if self.pdf_files:
+        # Scrapy waits on the returned Deferred before shutting down
+        return DeferredList(self.pdf_batches).addCallback(self.finish_crawl)
+    
+    def finish_crawl(self, _):
+        """Combine all PDFs once every batch is recorded"""
+        logger.info(f"Spider finished. Combining {len(self.pdf_blobs)} PDFs...")
+        
+        if self.pdf_blobs:
             self.combine_pdfs()
         else:
             logger.warning("No PDFs generated!")
@@ -182,37 +274,45 @@ class ProjectXSpider(scrapy.Spider):
     def combine_pdfs(self):
         """Combine all generated PDFs into one file"""
         try:
-            merger = PdfMerger()
-            
-            # Sort PDF files to maintain some order
-            sorted_pdfs = sorted(self.pdf_files)
-            
-            for pdf_file in sorted_pdfs:
-                if os.path.exists(pdf_file):
-                    logger.info(f"Adding to combined PDF: {pdf_file}")
-                    merger.append(pdf_file)
-            
-            # Output combined PDF
             output_path = 'projectx_complete.pdf'
-            merger.write(output_path)
-            merger.close()
+            pdf_blobs = [pdf_blob for _, pdf_blob in sorted(self.pdf_blobs.items())]
             
-            logger.info(f"✅ Combined PDF created: {output_path}")
-            logger.info(f"📄 Total pages combined: {len(sorted_pdfs)}")
+            # pdftk concatenates in one native pass; fall back to pypdf when it isn't installed
+            pdftk = shutil.which('pdftk')
+            if pdftk:
+                self.combine_with_pdftk(pdftk, pdf_blobs, output_path)
+            else:
+                logger.info("Merging with pypdf (install pdftk for faster merges)")
+                writer = PdfWriter()
+                
+                for pdf_blob in pdf_blobs:
+                    writer.append(io.BytesIO(pdf_blob))
+                
+                # Output combined PDF in a single write
+                with open(output_path, 'wb') as output_file:
+                    writer.write(output_file)
+                writer.close()
             
-            # Optionally clean up individual PDFs
-            cleanup = input("Delete individual PDF files? (y/N): ").lower().strip()
-            if cleanup == 'y':
-                for pdf_file in self.pdf_files:
-                    try:
-                        os.remove(pdf_file)
-                    except:
-                        pass
-                logger.info("Individual PDF files cleaned up")
+            logger.info(f"✅ Combined PDF created: {output_path}")
+            logger.info(f"📄 Total pages combined: {len(self.pdf_blobs)}")
                 
         except Exception as e:
             logger.error(f"Failed to combine PDFs: {e}")
 
+    def combine_with_pdftk(self, pdftk, pdf_blobs, output_path):
+        """Concatenate the page PDFs with pdftk's cat operation"""
+        logger.info(f"Merging with pdftk: {pdftk}")
+        
+        # pdftk only reads files, so the in-memory pages are written out for the one call
+        with tempfile.TemporaryDirectory() as temp_dir:
+            page_paths = []
+            for index, pdf_blob in enumerate(pdf_blobs):
+                page_path = Path(temp_dir) / f"page_{index:04d}.pdf"
+                page_path.write_bytes(pdf_blob)
+                page_paths.append(str(page_path))
+            
+            subprocess.run([pdftk, *page_paths, 'cat', 'output', output_path], check=True)
+
 def main():
     """Main function to run the crawler"""
     logger.info("🕷️  Starting ProjectX.com crawler (Windows version)...")
@@ -222,9 +322,11 @@ def main():
     settings.setdict({
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'ROBOTSTXT_OBEY': True,  # Respect robots.txt
-        'DOWNLOAD_DELAY': 1,     # Be polite - 1 second between requests
-        'RANDOMIZE_DOWNLOAD_DELAY': True,
-        'CONCURRENT_REQUESTS': 1,  # One request at a time
+        'AUTOTHROTTLE_ENABLED': True,  # Be polite - back off based on server latency
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 3.0,
+        'CONCURRENT_REQUESTS': 4,  # Fetch while earlier pages convert
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 4,
+        'REACTOR_THREADPOOL_MAXSIZE': os.cpu_count() * 2,  # Threads mostly wait on wkhtmltopdf
         'DEPTH_LIMIT': 3,        # Limit crawl depth
         'CLOSESPIDER_PAGECOUNT': 50,  # Limit total pages (adjust as needed)
         'LOG_LEVEL': 'INFO',
@@ -70,7 +70,7 @@ def main():
     print("• Target: https://www.projectx.com/")
     print("• Max pages: 50 (configurable)")
     print("• Max depth: 3 levels")
-    print("• Delay: 1 second between requests")
+    print("• Throttle: AutoThrottle, up to 4 concurrent requests")
     print("• Output: projectx_complete.pdf")
     print("=" * 40)
     
@@ -7,6 +7,7 @@ Downloads and installs wkhtmltopdf automatically
 import subprocess
 import sys
 import os
+import shutil
 import requests
 import zipfile
 from pathlib import Path
@@ -48,13 +49,14 @@ def download_wkhtmltopdf():
         with tempfile.TemporaryDirectory() as temp_dir:
             installer_path = Path(temp_dir) / "wkhtmltopdf_installer.exe"
             
-            # Download installer
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
-            
-            with open(installer_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            # Download installer, copying the raw stream in 1 MiB blocks
+            with requests.get(url, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                
+                # Buffer matches the copy block, so each 1 MiB read is a single write syscall
+                with open(installer_path, 'wb', buffering=1 << 20) as f:
+                    shutil.copyfileobj(response.raw, f, length=1 << 20)
             
             print("✅ Downloaded wkhtmltopdf installer")
             print(f"📍 Installer location: {installer_path}")